@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the plot scripts for reading iperf3 --logfile output.
+
+iperf3 can write extra output before the final JSON, so everything here works
+on the *last* top-level JSON object in the file.
+"""
+
+import functools
+import json
+import mmap
+import os
+import re
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+
+# "sum_sent" is a flat object under "end", so its fields can be pulled out
+# without parsing the (much larger) intervals/streams part of the document.
+_SUM_SENT_RE = {
+    key: re.compile(rb'"sum_sent"\s*:\s*\{[^{}]*?"' + key.encode() + rb'"\s*:\s*([-+0-9.eE]+)')
+    for key in ("end", "bits_per_second", "retransmits", "bytes")
+}
+
+# The "end" section sits at the end of the log, so for the sum_sent lookups
+# only the last few KB of the file need to be read.
+TAIL_BYTES = 16384
+
+# Written by run_test.py next to the <bdp>/<cca>/ result directories
+MANIFEST_NAME = "manifest.json"
+
+# simdjson parsers are reusable but not thread-safe: one per thread
+_local = threading.local()
+
+
+def loads(blob: bytes):
+    if orjson is not None:
+        return orjson.loads(blob)
+    return json.loads(blob)
+
+
+def read_last_blob(path: str) -> bytes:
+    """
+    Returns the last JSON object of the whole file. The file is mapped, not
+    read, so only the bytes from the last "\n{" onward are copied.
+    """
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        i = mm.rfind(b"\n{")
+        return mm[:] if i == -1 else mm[i + 1:]
+
+
+def last_json_blob(raw: bytes) -> bytes:
+    i = raw.rfind(b"\n{")
+    return raw if i == -1 else raw[i + 1:]
+
+
+def read_tail(path: str, nbytes: int = TAIL_BYTES):
+    """
+    Returns (tail, whole): the last `nbytes` of the file and whether that is
+    the entire file.
+    """
+    # Raw fd + pread: one positioned read, no buffered file object or seeks
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        start = max(0, size - nbytes)
+        return os.pread(fd, size - start, start), start == 0
+    finally:
+        os.close(fd)
+
+
+def stream_sum_sent(path: str):
+    """
+    Returns data["end"]["sum_sent"] of the last JSON object using ijson, so a
+    large object is scanned without building its intervals/streams part.
+    Raises KeyError / ValueError like the full parse would.
+    """
+    with open(path, "rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = mm.rfind(b"\n{") + 1
+        fh.seek(start)
+        try:
+            for ss in ijson.items(fh, "end.sum_sent", use_float=True):
+                return ss
+        except ijson.JSONError as e:
+            raise ValueError(str(e)) from e
+    raise KeyError("sum_sent")
+
+
+def simdjson_sum_sent(blob: bytes):
+    """
+    Returns data["end"]["sum_sent"] as a dict using simdjson, which only
+    materializes that object rather than the whole document.
+    Raises KeyError / ValueError like the full parse would.
+    """
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = simdjson.Parser()
+
+    # A parser cannot be reused while any proxy into its last document is
+    # alive, so none may outlive this call (not even via a traceback)
+    doc = ss = None
+    try:
+        try:
+            doc = parser.parse(blob)
+        except RuntimeError as e:
+            raise ValueError(str(e)) from None
+        ss = doc["end"]["sum_sent"]
+        if not isinstance(ss, simdjson.Object):
+            raise TypeError("sum_sent is not an object")
+        return ss.as_dict()
+    finally:
+        del doc, ss
+
+
+def read_last_json(path: str):
+    """
+    Parses the last JSON object in the file.
+    Raises FileNotFoundError / ValueError like json.loads would.
+    """
+    tail, whole = read_tail(path)
+    i = tail.rfind(b"\n{")
+    if i == -1 and not whole:
+        # The last object starts before the tail window
+        return loads(read_last_blob(path))
+    return loads(tail if i == -1 else tail[i + 1:])
+
+
+@functools.lru_cache(maxsize=None)
+def load_sum_sent(path: str):
+    """
+    Returns data["end"]["sum_sent"] of the last JSON object as a dict.
+    Memoized per path, so several lookups on one file read it only once.
+    Uses the regex fast path when every known key is found and falls back
+    to a full parse otherwise. Treat the result as read-only.
+    """
+    tail, whole = read_tail(path)
+    # Either the tail lies entirely inside the last object or it contains the
+    # object's start, so cutting at the last "\n{" never reaches an older one.
+    blob = last_json_blob(tail)
+
+    ss = {}
+    for key, rx in _SUM_SENT_RE.items():
+        m = rx.search(blob)
+        if m is None:
+            break
+        ss[key] = float(m.group(1))
+    else:
+        return ss
+
+    if blob is tail and not whole:
+        # The last object is bigger than the tail window
+        if ijson is not None:
+            # Stream it rather than loading the whole thing
+            return stream_sum_sent(path)
+        if simdjson is not None:
+            return simdjson_sum_sent(read_last_blob(path))
+    elif simdjson is not None:
+        return simdjson_sum_sent(blob)
+    return read_last_json(path)["end"]["sum_sent"]
+
+
+def sum_sent_values(path: str, keys):
+    """
+    Returns tuple(data["end"]["sum_sent"][k] for k in keys) from the last
+    JSON object.
+    """
+    ss = load_sum_sent(path)
+    return tuple(ss[k] for k in keys)
+
+
+def sum_sent_value(path: str, key: str):
+    """
+    Returns data["end"]["sum_sent"][key] from the last JSON object.
+    """
+    return load_sum_sent(path)[key]
+
+
+def load_manifest(root: str = "."):
+    """
+    Returns run_test.py's manifest as {bdp: {cca: set(names)}}, or None if
+    there is no usable one. root is run_test.py's --out-root; the plot
+    scripts run from there, so their "<bdp>/<cca>/hsN_out.json" paths and
+    the default root agree.
+    """
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), "rb") as fh:
+            manifest = loads(fh.read())
+        return {
+            bdp: {cca: set(names) for cca, names in by_cca.items()}
+            for bdp, by_cca in manifest.items()
+        }
+    except (FileNotFoundError, ValueError, AttributeError, TypeError):
+        return None
+
+
+def manifest_excludes(manifest, path: str) -> bool:
+    """
+    True if the manifest covers path's <bdp>/<cca> directory and does not
+    list the file (that run never wrote it). Directories the manifest has no
+    entry for are left to be read as before.
+    """
+    if manifest is None:
+        return False
+    bdp, cca, name = path.split("/", 2)
+    names = manifest.get(bdp, {}).get(cca)
+    return names is not None and name not in names
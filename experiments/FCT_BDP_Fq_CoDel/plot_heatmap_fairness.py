@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 
-import json
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
-from pathlib import Path
+
+from iperf_json import load_manifest, manifest_excludes, sum_sent_value
+
+NUM_HOSTS = 128
+MAX_WORKERS = 32
 
 
 def get_bits_per_second(path: str, previous=None):
@@ -12,52 +17,27 @@ def get_bits_per_second(path: str, previous=None):
     in the file (iperf3 JSON can have extra output before the final JSON).
     """
     try:
-        text = Path(path).read_text().strip()
-    except FileNotFoundError:
+        return sum_sent_value(path, "bits_per_second")
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
         return previous
 
-    i = text.rfind("\n{")
-    i = 0 if i == -1 else i + 1
-
-    try:
-        data = json.loads(text[i:])
-    except json.JSONDecodeError:
-        return previous
-
-    try:
-        return data["end"]["sum_sent"]["bits_per_second"]
-    except (KeyError, TypeError):
-        return previous
 
-
-def clean_numeric(values):
-    cleaned = []
-    for v in values:
-        if v is None:
-            continue
-        try:
-            fv = float(v)
-        except (TypeError, ValueError):
-            continue
-        if np.isnan(fv) or np.isinf(fv):
-            continue
-        cleaned.append(fv)
-    return np.array(cleaned, dtype=float)
-
-
-def jain_fairness(values):
+def jain_fairness(values, axis=-1):
     """
-    Jain's fairness index:
+    Jain's fairness index along `axis`, ignoring non-finite entries:
         J = (sum(x)^2) / (n * sum(x^2)),  0..1
     """
-    x = clean_numeric(values)
-    n = x.size
-    if n == 0:
-        return np.nan
-    denom = n * np.sum(x * x)
-    if denom == 0:
-        return np.nan
-    return float((np.sum(x) ** 2) / denom)
+    x = np.asarray(values, dtype=float)
+    finite = np.isfinite(x)
+    x = np.where(finite, x, 0.0)
+
+    s = x.sum(axis=axis)
+    s2 = (x * x).sum(axis=axis)
+    n = finite.sum(axis=axis)
+    denom = n * s2
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denom > 0, (s * s) / denom, np.nan)
 
 
 def main():
@@ -71,16 +51,29 @@ def main():
         ("prague", "Prague"),
     ]
 
-    # Build fairness matrix: rows=BDP, cols=CCA
-    fairness = np.full((len(bdp_list), len(ccas)), np.nan, dtype=float)
+    # One flat job list over (BDP, CCA, host) so a single pool keeps the
+    # disk busy across all cells
+    paths = [
+        f"{bdp}BDP/{cca_dir}/hs{i}_out.json"
+        for bdp in bdp_list
+        for cca_dir, _ in ccas
+        for i in range(1, NUM_HOSTS + 1)
+    ]
+    # Files missing from a (bdp, cca) run recorded in run_test.py's manifest
+    # were never written; skip them without an open() attempt
+    listed = load_manifest()
+
+    def load(path):
+        if manifest_excludes(listed, path):
+            return None
+        return get_bits_per_second(path)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        bps = np.array(list(ex.map(load, paths)), dtype=float)
+    bps = bps.reshape(len(bdp_list), len(ccas), NUM_HOSTS)
 
-    for r, bdp in enumerate(bdp_list):
-        for c, (cca_dir, _) in enumerate(ccas):
-            bps_values = []
-            for i in range(1, 129):
-                path = f"{bdp}BDP/{cca_dir}/hs{i}_out.json"
-                bps_values.append(get_bits_per_second(path))
-            fairness[r, c] = jain_fairness(bps_values)
+    # Build fairness matrix: rows=BDP, cols=CCA (reduce over hosts)
+    fairness = jain_fairness(bps, axis=2)
 
     # Plot heatmap
     fig, ax = plt.subplots(figsize=(7.5, 4.5))
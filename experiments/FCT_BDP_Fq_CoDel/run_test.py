@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 
 import argparse
+import json
 import os
+import selectors
 import shutil
+import socket
 import subprocess
-import time
 from pathlib import Path
 
 DEFAULT_M = "/home/ubuntu/mininet/util/m"
 OUT_ROOT = "/home/ubuntu/AQM_CCA/experiments/FCT_BDP_Fq_CoDel"
 IP_PREFIX = "172.17.0"
+MANIFEST_NAME = "manifest.json"
 
 
 def find_m(m_path):
@@ -21,18 +24,121 @@ def find_m(m_path):
     raise SystemExit("ERROR: cannot find Mininet m. Use --m /home/ubuntu/mininet/util/m")
 
 
+class HostDaemonJob:
+    """
+    Popen-like handle for a command run by scripts/host_daemon.py inside the
+    host's namespace. The daemon replies on the connection once the command
+    exits, so the socket is what wait_all() selects on.
+    """
+
+    def __init__(self, sock_path, argv, stderr_path):
+        self.returncode = None
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(sock_path)
+            req = {"argv": argv, "stderr": stderr_path}
+            self.sock.sendall(json.dumps(req).encode() + b"\n")
+        except OSError:
+            self.sock.close()
+            raise
+
+    def wait(self):
+        if self.returncode is None:
+            buf = b""
+            while not buf.endswith(b"\n"):
+                chunk = self.sock.recv(4096)
+                if not chunk:
+                    break
+                buf += chunk
+            self.sock.close()
+            try:
+                self.returncode = json.loads(buf)["rc"]
+            except (ValueError, KeyError, TypeError):
+                self.returncode = -1  # daemon went away without a reply
+        return self.returncode
+
+
+def wait_all(hosts, popens):
+    """
+    Block until every process in popens has exited (hosts[k] is the host id
+    of popens[k]).
+    Each child gets a pidfd (daemon jobs: their socket), which becomes
+    readable when it exits, so there is no sleep/poll interval between a
+    transfer finishing and us noticing.
+    """
+    total = len(popens)
+    done = 0
+    sel = selectors.DefaultSelector()
+    try:
+        for k, p in enumerate(popens):
+            if isinstance(p, HostDaemonJob):
+                sel.register(p.sock, selectors.EVENT_READ, data=k)
+            else:
+                sel.register(os.pidfd_open(p.pid), selectors.EVENT_READ, data=k)
+    except (AttributeError, OSError):
+        # No pidfd support (old kernel/Python): fall back to blocking waits
+        for key in list(sel.get_map().values()):
+            if isinstance(key.fileobj, int):
+                os.close(key.fd)
+        sel.close()
+        for i, p in zip(hosts, popens):
+            p.wait()
+            done += 1
+            print(f"Finished {done}/{total} (hs{i})")
+        return
+
+    with sel:
+        while done < total:
+            for key, _ in sel.select():
+                k = key.data
+                sel.unregister(key.fileobj)
+                if isinstance(key.fileobj, int):
+                    os.close(key.fd)  # pidfd; daemon sockets close in wait()
+                popens[k].wait()  # reap; already exited
+                done += 1
+                print(f"Finished {done}/{total} (hs{hosts[k]})")
+
+
+def update_manifest(out_root, bdp, cca, outdir):
+    """
+    Record the hsN_out.json files present for this (bdp, cca) in
+    <out_root>/manifest.json ({bdp: {cca: [names]}}), so the plot scripts
+    know which files exist without probing each one. They read it (and the
+    <bdp>/<cca>/ directories) from their working directory, so run them from
+    out_root.
+    """
+    path = Path(out_root).resolve() / MANIFEST_NAME
+    try:
+        manifest = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    with os.scandir(outdir) as it:
+        names = sorted(e.name for e in it if e.name.endswith("_out.json") and e.is_file())
+    manifest.setdefault(bdp, {})[cca] = names
+
+    tmp = path.with_name(MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True) + "\n")
+    os.replace(tmp, path)
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("num_hosts", type=int, help="Number of hosts (hs1..hsN)")
     ap.add_argument("--cca", required=True, help="prague, bbr, cubic, etc.")
     ap.add_argument("--bdp", required=True, help="0.1BDP, 1BDP, 20BDP, etc.")
     ap.add_argument("--nbytes", required=True, help="iperf3 -n value, e.g., 6.25g, 10g")
+    ap.add_argument("--streams", type=int, default=1,
+                    help="iperf3 -P parallel streams per host (one process carries all of them)")
     ap.add_argument("--ip-prefix", default=IP_PREFIX)
     ap.add_argument("--out-root", default=OUT_ROOT)
     ap.add_argument("--m", default=DEFAULT_M)
+    ap.add_argument("--host-daemon", metavar="DIR", default=None,
+                    help="send each command to DIR/hsN.sock (scripts/host_daemon.py, "
+                         "started by topo_h1.py --host-daemon) instead of launching it through m")
     args = ap.parse_args()
 
-    m = find_m(args.m)
+    m = None if args.host_daemon else find_m(args.m)
 
     outdir = (Path(args.out_root) / args.bdp / args.cca).resolve()
     outdir.mkdir(parents=True, exist_ok=True)
@@ -40,17 +146,22 @@ def main():
     print(f"Saving JSON to: {outdir}")
     print(f"Launching hs1..hs{args.num_hosts} concurrently...")
 
-    procs = {}       # host_id -> Popen
-    finished = set() # host_ids already counted as finished
+    # Per-host state as parallel lists indexed by launch order
+    hosts = list(range(1, args.num_hosts + 1))
+    popens = []
+
+    # One shared stderr log for the whole batch (iperf3 stderr is rare; the
+    # JSON goes to --logfile), instead of a file handle per host. Truncated
+    # here so it only holds this run; host_daemon.py appends to it as well
+    err_log_path = outdir / "batch_err.log"
+    err_log = err_log_path.open("wb")
 
     # Start ALL hosts at once
-    for i in range(1, args.num_hosts + 1):
+    for i in hosts:
         out_json = outdir / f"hs{i}_out.json"
-        if out_json.exists():
-            out_json.unlink()
+        out_json.unlink(missing_ok=True)
 
         cmd = [
-            m, f"hs{i}",
             "iperf3",
             "-c", f"{args.ip_prefix}.{i}",
             "-J",
@@ -58,30 +169,40 @@ def main():
             "-C", args.cca,
             "--logfile", str(out_json),   # iperf3 writes JSON here
         ]
-
-        procs[i] = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if args.streams > 1:
+            # Extra flows ride in the same iperf3 process (end.sum_sent is
+            # their aggregate), instead of one more m/iperf3 launch each
+            cmd += ["-P", str(args.streams)]
+
+        if args.host_daemon:
+            sock_path = os.path.join(args.host_daemon, f"hs{i}.sock")
+            try:
+                popens.append(HostDaemonJob(sock_path, cmd, str(err_log_path)))
+            except OSError as e:
+                raise SystemExit(f"ERROR: cannot reach host daemon {sock_path}: {e}")
+        else:
+            popens.append(subprocess.Popen([m, f"hs{i}"] + cmd, stdout=subprocess.DEVNULL, stderr=err_log))
 
     # Wait until the LAST transfer finishes
-    total = args.num_hosts
-    while len(finished) < total:
-        for i, p in procs.items():
-            if i in finished:
-                continue
-            if p.poll() is not None:  # finished
-                finished.add(i)
-                print(f"Finished {len(finished)}/{total} (hs{i})")
-        time.sleep(0.5)
+    wait_all(hosts, popens)
+    err_log.close()
+    update_manifest(args.out_root, args.bdp, args.cca, outdir)
 
     # Check results after all are done
     failures = 0
-    for i, p in procs.items():
+    for i, p in zip(hosts, popens):
         rc = p.returncode
         out_json = outdir / f"hs{i}_out.json"
-        empty = (not out_json.exists()) or (out_json.stat().st_size == 0)
+        try:
+            empty = out_json.stat().st_size == 0
+        except FileNotFoundError:
+            empty = True
         if rc != 0 or empty:
             failures += 1
             print(f"hs{i} FAILED (rc={rc}, empty_json={empty})")
 
+    if failures:
+        print(f"stderr of this run, all hosts (if any): {err_log_path}")
     print(f"Done. failures={failures}")
     raise SystemExit(0 if failures == 0 else 1)
 
@@ -1,55 +1,50 @@
 #!/usr/bin/env python3
 
-import json
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
-from pathlib import Path
 
+from iperf_json import sum_sent_value
 
-def get_end_time(path: str, previous=None):
-    text = Path(path).read_text().strip()
+NUM_HOSTS = 128
+MAX_WORKERS = 32
 
-    i = text.rfind("\n{")
-    i = 0 if i == -1 else i + 1
+# Bigger fonts everywhere
+plt.rcParams.update({
+    "font.size": 13,
+    "axes.labelsize": 15,
+    "xtick.labelsize": 13,
+    "ytick.labelsize": 13,
+    "legend.fontsize": 9,
+})
 
-    data = json.loads(text[i:])
+
+def get_end_time(path: str, previous=None):
     try:
-        return data["end"]["sum_sent"]["end"]
+        return sum_sent_value(path, "end")
     except (KeyError, TypeError):
         return previous
 
 
-def clean_numeric(values):
-    cleaned = []
-    for v in values:
-        if v is None:
-            continue
-        try:
-            fv = float(v)
-        except (TypeError, ValueError):
-            continue
-        if np.isnan(fv):
-            continue
-        cleaned.append(fv)
-    return np.array(cleaned, dtype=float)
-
-
-def cdf(values):
-    arr = clean_numeric(values)
-    if arr.size == 0:
-        return np.array([]), np.array([])
-    x = np.sort(arr)
-    y = np.arange(1, len(x) + 1) / len(x)
-    return x, y
-
+def cdf_stats(values):
+    """
+    Batched empirical CDFs and mean/std over the last axis of `values`
+    (NaN = missing). Returns (sorted, y, counts, means, stds); NaNs sort
+    last, so the CDF of row k is (sorted[k, :counts[k]], y[k, :counts[k]]).
+    """
+    values = np.where(np.isfinite(values), values, np.nan)
+    sorted_vals = np.sort(values, axis=-1)
+    counts = np.count_nonzero(~np.isnan(values), axis=-1)
+    ranks = np.arange(1, values.shape[-1] + 1, dtype=np.float64)
 
-def mean_std(values):
-    arr = clean_numeric(values)
-    if arr.size == 0:
-        return np.nan, np.nan
-    mu = float(np.mean(arr))
-    sigma = float(np.std(arr, ddof=1)) if arr.size > 1 else 0.0
-    return mu, sigma
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y = ranks / counts[..., None]
+        means = np.nansum(values, axis=-1) / counts
+        sq_dev = np.nansum((values - means[..., None]) ** 2, axis=-1)
+        stds = np.where(counts > 1, np.sqrt(sq_dev / (counts - 1)), 0.0)
+    stds = np.where(counts > 0, stds, np.nan)
+    return sorted_vals, y, counts, means, stds
 
 
 def fit_fig_width_to_legend(fig, legend, pad_in=0.6, min_width_in=5.0):
@@ -68,35 +63,43 @@ def fit_fig_width_to_legend(fig, legend, pad_in=0.6, min_width_in=5.0):
 
 
 def main():
-    # Bigger fonts everywhere
-    plt.rcParams.update({
-        "font.size": 13,
-        "axes.labelsize": 15,
-        "xtick.labelsize": 13,
-        "ytick.labelsize": 13,
-        "legend.fontsize": 9,
-    })
-
     bdp_list = [0.1, 0.5, 1, 5, 10, 20]
-
-    for bdp in bdp_list:
-        prague, bbr3, cubic = [], [], []
-
-        for i in range(1, 129):
-            prague.append(get_end_time(f"{bdp}BDP/prague/hs{i}_out.json"))
-            bbr3.append(get_end_time(f"{bdp}BDP/bbr/hs{i}_out.json"))
-            cubic.append(get_end_time(f"{bdp}BDP/cubic/hs{i}_out.json"))
-
-        x_p, y_p = cdf(prague)
-        x_b, y_b = cdf(bbr3)
-        x_c, y_c = cdf(cubic)
-
-        mu_p, sig_p = mean_std(prague)
-        mu_b, sig_b = mean_std(bbr3)
-        mu_c, sig_c = mean_std(cubic)
-
-        # Start with a reasonable size; we'll auto-adjust width to legend
-        fig, ax = plt.subplots(figsize=(11, 5.5))
+    ccas = ["prague", "bbr", "cubic"]
+
+    # Read every (BDP, CCA, host) file through one pool; the work is mostly
+    # open()/read() latency, so the reads overlap well across threads.
+    paths = [
+        f"{bdp}BDP/{cca}/hs{i}_out.json"
+        for bdp in bdp_list
+        for cca in ccas
+        for i in range(1, NUM_HOSTS + 1)
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        end_times = np.array(list(ex.map(get_end_time, paths)), dtype=float)
+    # Missing end times are NaN
+    end_times = end_times.reshape(len(bdp_list), len(ccas), NUM_HOSTS)
+
+    # One sort and one mean/std pass over all (BDP, CCA) rows, CDF y values
+    # included
+    sorted_end, y_end, counts, means, stds = cdf_stats(end_times)
+
+    # One figure reused for every BDP. Start with a reasonable size; the width
+    # is fitted to the legend on the first pass only (it needs a full draw).
+    fig, ax = plt.subplots(figsize=(11, 5.5))
+    width_fitted = False
+
+    for r, bdp in enumerate(bdp_list):
+        # Rows follow `ccas`: prague, bbr, cubic
+        n_p, n_b, n_c = counts[r]
+        x_p, y_p = sorted_end[r, 0, :n_p], y_end[r, 0, :n_p]
+        x_b, y_b = sorted_end[r, 1, :n_b], y_end[r, 1, :n_b]
+        x_c, y_c = sorted_end[r, 2, :n_c], y_end[r, 2, :n_c]
+
+        mu_p, sig_p = means[r, 0], stds[r, 0]
+        mu_b, sig_b = means[r, 1], stds[r, 1]
+        mu_c, sig_c = means[r, 2], stds[r, 2]
+
+        ax.cla()
 
         # Labels (requested names)
         lbl_c = f"CUBIC\n$\\mu$ = {mu_c:.2f}\n$\\sigma$ = {sig_c:.2f}"
@@ -124,13 +127,16 @@ def main():
         )
 
         # Make figure width similar to legend width
-        fit_fig_width_to_legend(fig, leg, pad_in=0.6, min_width_in=5.0)
+        if not width_fitted:
+            fit_fig_width_to_legend(fig, leg, pad_in=0.6, min_width_in=5.0)
+            width_fitted = True
 
         # Re-layout after resizing; reserve top space for legend
         fig.tight_layout(rect=[0, 0, 1, 0.86])
 
         fig.savefig(f"cdf_fct_{bdp}BDP_RED.pdf", bbox_inches="tight", pad_inches=0.12)
-        plt.close(fig)
+
+    plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,23 @@
 #!/usr/bin/env python3
 
-import json
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # file output only; skip loading an interactive backend
 import matplotlib.pyplot as plt
-from pathlib import Path
+from matplotlib.colors import LogNorm
+
+from iperf_json import load_manifest, manifest_excludes, sum_sent_value, sum_sent_values
+
+NUM_HOSTS = 128
+MAX_WORKERS = 32
+
+# (retransmits, bytes) per result file, keyed on absolute path and checked
+# against (st_mtime_ns, st_size), so re-runs only parse files that changed
+CACHE_PATH = os.path.expanduser("~/.cache/fct_bdp/retx.pkl")
 
 
 def get_bits_per_second(path: str, previous=None):
@@ -12,21 +26,8 @@ def get_bits_per_second(path: str, previous=None):
     in the file (iperf3 JSON can have extra output before the final JSON).
     """
     try:
-        text = Path(path).read_text().strip()
-    except FileNotFoundError:
-        return previous
-
-    i = text.rfind("\n{")
-    i = 0 if i == -1 else i + 1
-
-    try:
-        data = json.loads(text[i:])
-    except json.JSONDecodeError:
-        return previous
-
-    try:
-        return data["end"]["sum_sent"]["bits_per_second"]
-    except (KeyError, TypeError):
+        return sum_sent_value(path, "bits_per_second")
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
         return previous
 
 
@@ -38,39 +39,52 @@ def get_retx_and_bytes(path: str, previous=(None, None)):
     for the *last* JSON object.
     """
     try:
-        text = Path(path).read_text().strip()
-    except FileNotFoundError:
+        return sum_sent_values(path, ("retransmits", "bytes"))
+    except (FileNotFoundError, ValueError, KeyError, TypeError, AttributeError):
         return previous
 
-    i = text.rfind("\n{")
-    i = 0 if i == -1 else i + 1
 
+def load_cache(path: str = CACHE_PATH):
     try:
-        data = json.loads(text[i:])
-    except json.JSONDecodeError:
-        return previous
+        with open(path, "rb") as fh:
+            cache = pickle.load(fh)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
 
+
+def save_cache(cache, path: str = CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump(cache, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def cached_retx_and_bytes(path: str, cache, fresh, previous=(None, None)):
+    """
+    get_retx_and_bytes() through `cache`; a file whose mtime/size still
+    match its entry is not read at all. New entries go into `fresh`.
+    """
     try:
-        ss = data["end"]["sum_sent"]
-        # Explicitly use the exact fields you specified
-        return ss["retransmits"], ss["bytes"]
-    except (KeyError, TypeError, AttributeError):
+        st = os.stat(path)
+    except FileNotFoundError:
         return previous
 
+    key = os.path.abspath(path)
+    sig = (st.st_mtime_ns, st.st_size)
+    hit = cache.get(key)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
+
+    value = get_retx_and_bytes(path, previous)
+    fresh[key] = (sig, value)
+    return value
+
 
 def clean_numeric(values):
-    cleaned = []
-    for v in values:
-        if v is None:
-            continue
-        try:
-            fv = float(v)
-        except (TypeError, ValueError):
-            continue
-        if np.isnan(fv) or np.isinf(fv):
-            continue
-        cleaned.append(fv)
-    return np.array(cleaned, dtype=float)
+    a = np.asarray(values, dtype=float)
+    return a[np.isfinite(a)]
 
 
 def jain_fairness(values):
@@ -79,13 +93,12 @@ def jain_fairness(values):
         J = (sum(x)^2) / (n * sum(x^2)),  0..1
     """
     x = clean_numeric(values)
-    n = x.size
-    if n == 0:
-        return np.nan
-    denom = n * np.sum(x * x)
-    if denom == 0:
+    # np.dot gives sum(x^2) without materializing x*x
+    s2 = float(np.dot(x, x))
+    if x.size == 0 or s2 == 0.0:
         return np.nan
-    return float((np.sum(x) ** 2) / denom)
+    s = float(x.sum())
+    return (s * s) / (x.size * s2)
 
 
 def main():
@@ -99,33 +112,52 @@ def main():
         ("prague", "Prague"),
     ]
 
-    # Build retransmission-% matrix: rows=BDP, cols=CCA
-    retx_pct = np.full((len(bdp_list), len(ccas)), np.nan, dtype=float)
-
     # Approximate TCP segments from bytes using MSS (adjust if you want)
     MSS_BYTES = 1460.0
 
-    for r, bdp in enumerate(bdp_list):
-        for c, (cca_dir, _) in enumerate(ccas):
-            total_retx = 0.0
-            total_bytes = 0.0
-
-            for i in range(1, 129):
-                path = f"{bdp}BDP/{cca_dir}/hs{i}_out.json"
-                retx, byt = get_retx_and_bytes(path)
-
-                if retx is None or byt is None:
-                    continue
-
-                try:
-                    total_retx += float(retx)
-                    total_bytes += float(byt)
-                except (TypeError, ValueError):
-                    continue
-
-            if total_bytes > 0:
-                est_segments = total_bytes / MSS_BYTES
-                retx_pct[r, c] = (total_retx / est_segments) * 100.0 if est_segments > 0 else np.nan
+    # Files missing from a (bdp, cca) run recorded in run_test.py's manifest
+    # were never written
+    listed = load_manifest()
+    cache = load_cache()
+    fresh = {}
+
+    def load(path):
+        # (retransmits, bytes) as floats; NaN pair if either is unusable
+        if manifest_excludes(listed, path):
+            return (np.nan, np.nan)
+        retx, byt = cached_retx_and_bytes(path, cache, fresh)
+        if retx is None or byt is None:
+            return (np.nan, np.nan)
+        try:
+            return (float(retx), float(byt))
+        except (TypeError, ValueError):
+            return (np.nan, np.nan)
+
+    # One flat job list over (BDP, CCA, host) through a single pool, as in
+    # plot_heatmap_fairness.py; results come back in job order
+    paths = [
+        f"{bdp}BDP/{cca_dir}/hs{i}_out.json"
+        for bdp in bdp_list
+        for cca_dir, _ in ccas
+        for i in range(1, NUM_HOSTS + 1)
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        pairs = np.array(list(ex.map(load, paths)), dtype=float)
+    pairs = pairs.reshape(len(bdp_list), len(ccas), NUM_HOSTS, 2)
+
+    # Build retransmission-% matrix: rows=BDP, cols=CCA (sum over hosts)
+    total_retx = np.nansum(pairs[..., 0], axis=2)
+    total_bytes = np.nansum(pairs[..., 1], axis=2)
+    est_segments = total_bytes / MSS_BYTES
+    with np.errstate(invalid="ignore", divide="ignore"):
+        retx_pct = np.where(est_segments > 0, (total_retx / est_segments) * 100.0, np.nan)
+
+    if fresh:
+        cache.update(fresh)
+        try:
+            save_cache(cache)
+        except OSError as e:
+            print(f"Warning: could not write {CACHE_PATH}: {e}")
 
     # Plot heatmap
     fig, ax = plt.subplots(figsize=(7.5, 4.5))
@@ -137,15 +169,23 @@ def main():
     vmax = float(np.nanmax(retx_pct_num)) if np.isfinite(np.nanmax(retx_pct_num)) else 1.0
     vmax = max(vmax, 0.1)
 
-    cmap = plt.get_cmap("RdYlGn_r").copy()
+    # Retransmission % spans orders of magnitude across BDP/CCA, so color on
+    # a log scale; zero cells clip to the bottom of the map rather than
+    # turning into "bad" (gray is reserved for missing data)
+    positive = retx_pct_num[np.isfinite(retx_pct_num) & (retx_pct_num > 0)]
+    vmin = max(float(positive.min()), 1e-3) if positive.size else 1e-3
+    vmin = min(vmin, vmax / 10.0)
+    norm = LogNorm(vmin=vmin, vmax=vmax, clip=True)
+
+    # Perceptually uniform sequential map (was RdYlGn_r)
+    cmap = plt.get_cmap("magma").copy()
     cmap.set_bad(color="lightgray")
 
     im = ax.imshow(
         np.ma.array(retx_pct_num, mask=mask),
         aspect="auto",
         cmap=cmap,
-        vmin=0.0,
-        vmax=vmax,
+        norm=norm,
         origin="lower",
         interpolation="nearest",
         alpha=1.0,
@@ -166,7 +206,10 @@ def main():
         for cc in range(retx_pct_num.shape[1]):
             v = retx_pct_num[rr, cc]
             txt = "NA" if not np.isfinite(v) else f"{v:.2f}"
-            ax.text(cc, rr, txt, ha="center", va="center", fontsize=10)
+            # magma's low end is near black: light text on the dark cells
+            dark = np.isfinite(v) and norm(v) < 0.5
+            ax.text(cc, rr, txt, ha="center", va="center", fontsize=10,
+                    color="white" if dark else "black")
 
     # Colorbar
     cbar = fig.colorbar(im, ax=ax)
@@ -0,0 +1,80 @@
+"""
+_ss_host_shell.py
+
+Helpers shared by publish_ss_json_http.py and ss_tin_table_per_host.py for
+polling `ss -tin` in Mininet hosts: a long-lived shell per host, and a cheap
+digest to tell whether a host's output changed since the last poll.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import subprocess
+import time
+from typing import Tuple
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+_SS_END = b"\n__SS_END__ "
+
+
+class HostShell:
+    """
+    Long-lived `m <host> bash -s` for one Mininet host. Each poll writes
+    `ss -tin` plus an end marker carrying its exit status to the shell's
+    stdin, so only ss itself is exec'd per poll (not m/bash/mnexec).
+    """
+
+    def __init__(self, m_path: str, host: str):
+        self.proc = subprocess.Popen(
+            [m_path, host, "bash", "-s"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.fd = self.proc.stdout.fileno()
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def close(self) -> None:
+        # Closing stdin alone ends the shell (EOF) even if `m` did not exec it
+        for f in (self.proc.stdin, self.proc.stdout):
+            try:
+                f.close()
+            except OSError:
+                pass
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+    def run_ss(self, timeout: float) -> Tuple[int, str]:
+        """(rc, stdout) of one `ss -tin`; OSError if the shell died or timed out."""
+        self.proc.stdin.write(b"ss -tin; printf '\\n__SS_END__ %d\\n' $?\n")
+        self.proc.stdin.flush()
+
+        deadline = time.monotonic() + timeout
+        buf = b""
+        while True:
+            end = buf.find(_SS_END)
+            if end != -1 and buf.endswith(b"\n"):
+                rc = int(buf[end + len(_SS_END):])
+                return rc, buf[:end].decode(errors="replace")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.fd], [], [], remaining)[0]:
+                raise OSError(f"no reply within {timeout}s")
+            chunk = os.read(self.fd, 65536)
+            if not chunk:
+                raise OSError("shell exited")
+            buf += chunk
+
+
+def output_digest(out: str) -> int:
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(out)
+    return hash(out)
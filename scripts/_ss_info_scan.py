@@ -0,0 +1,59 @@
+"""
+_ss_info_scan.py
+
+`ss -tin` line scanning shared by ss_tin_plot.py and
+monitor_ss_table_terminal.py: the per-flow fields of a tcp info line, and
+the address:port tokens of a socket header line.
+"""
+
+import re
+
+# One alternation covering every field we read from a tcp info line, so the
+# line is scanned once instead of once per field. Groups per branch:
+#   1,2   cwnd/mss/rto/bytes_acked:<int>
+#   3     minrtt:<float>
+#   4     rtt:<avg>/<var>
+#   5,6,7 send/pacing_rate/delivery_rate <n>[KMG]bps
+#   8,9   bbr:(... bw:<n>[KMG]bps
+_INFO_RE = re.compile(
+    r"\b(cwnd|mss|rto|bytes_acked):(\d+)\b"
+    r"|\bminrtt:(\d+(?:\.\d+)?)\b"
+    r"|\brtt:(\d+(?:\.\d+)?)/\d+(?:\.\d+)?\b"
+    r"|\b(send|pacing_rate|delivery_rate)\s+(\d+)([KMG]?)bps\b"
+    r"|bbr:\([^)]*?\bbw:(\d+)([KMG]?)bps"
+)
+_PORT_SUFFIX_RE = re.compile(r":\d+$")
+_RATE_SCALE = {"": 1.0, "K": 1e3, "M": 1e6, "G": 1e9}
+_RATE_KEYS = {"send": "send_bps", "pacing_rate": "pacing_bps", "delivery_rate": "delivery_bps"}
+
+
+def scan_info(info):
+    """
+    Returns {field: value} for the fields found in one tcp info line; the
+    first occurrence of each field wins.
+    """
+    out = {}
+    for m in _INFO_RE.finditer(info):
+        key, num, minrtt, rtt, rate_key, rate, unit, bw, bw_unit = m.groups()
+        if key is not None:
+            out.setdefault(key, int(num))
+        elif minrtt is not None:
+            out.setdefault("minrtt_ms", float(minrtt))
+        elif rtt is not None:
+            out.setdefault("rtt_ms", float(rtt))
+        elif rate_key is not None:
+            out.setdefault(_RATE_KEYS[rate_key], float(rate) * _RATE_SCALE[unit])
+        else:
+            out.setdefault("bbr_bw_bps", float(bw) * _RATE_SCALE[bw_unit])
+    return out
+
+
+def extract_ipport_tokens(header_line):
+    parts = header_line.split()
+    return [p for p in parts if ":" in p and _PORT_SUFFIX_RE.search(p)]
+
+
+def keep_port(src, dst, port):
+    if port is None:
+        return True
+    return (src and src.endswith(f":{port}")) or (dst and dst.endswith(f":{port}"))
@@ -0,0 +1,38 @@
+"""
+_ss_summary_table.py
+
+Per-host summary table shared by ss_tin_plot.py and
+monitor_ss_table_terminal.py: one row per host (flow count, CC, RTT, cwnd,
+send/ACK/pacing/delivery rates), as built by their summarize functions.
+"""
+
+HEADER = (
+    f"{'Host':<5} {'#F':>3} {'CC':<5} "
+    f"{'RTT':>7} {'minRTT':>7} {'cwnd':>6} {'MSS':>5} {'RTO':>5} "
+    f"{'Send(M)':>9} {'Send(bps)':>12} "
+    f"{'ACK(M)':>9} {'ACK(bps)':>12} "
+    f"{'Pace(M)':>9} {'Del(M)':>9} {'BBRbw(M)':>9}"
+)
+
+# Row templates, parsed once. Missing metrics go in as NaN and their "nan"
+# is swapped for a dash of the same width, so no cell needs its own branch.
+_ROW_HEAD = "{host:<5} {flows:>3} {cc:<5} "
+_ROW_NUM = (
+    "{avg_rtt:>7.2f} {min_rtt:>7.2f} {avg_cwnd:>6.1f} {mss:>5.0f} {rto:>5.0f} "
+    "{send_mbps:>9.2f} {send_bps:>12.3e} "
+    "{ack_mbps:>9.2f} {ack_bps:>12.3e} "
+    "{pacing_mbps:>9.2f} {delivery_mbps:>9.2f} {bbr_bw_mbps:>9.2f}"
+)
+_NUM_KEYS = ("avg_rtt", "min_rtt", "avg_cwnd", "rto", "send_mbps", "send_bps",
+             "ack_mbps", "ack_bps", "pacing_mbps", "delivery_mbps", "bbr_bw_mbps")
+_NAN = float("nan")
+
+
+def format_table(rows):
+    """The header, rule and one line per row dict, newline-terminated."""
+    lines = [HEADER, "-" * len(HEADER)]
+    for r in rows:
+        vals = {k: _NAN if r[k] is None else r[k] for k in _NUM_KEYS}
+        vals["mss"] = _NAN if r["mss"] is None else int(r["mss"])  # truncated, not rounded
+        lines.append(_ROW_HEAD.format_map(r) + _ROW_NUM.format_map(vals).replace("nan", "  -"))
+    return "\n".join(lines) + "\n"
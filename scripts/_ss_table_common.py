@@ -0,0 +1,241 @@
+"""
+_ss_table_common.py
+
+Table layer shared by ss_tin_table.py and ss_tin_table_per_host.py: cell
+formatting, the narrow/wide row layouts and the terminal-width table
+printer, all working on the dict returned by parse_ss_tin_output().
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import shutil
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def fmt_value(v: Any) -> str:
+    """Human friendly formatting for values produced by the parser."""
+    # Most cells are already str or int: settle those with one type check
+    t = type(v)
+    if t is str:
+        return v
+    if t is int:
+        return str(v)
+    if v is None:
+        return ""
+    if isinstance(v, dict):
+        # unit style: {"value": 123, "unit": "bps"}
+        if "value" in v and "unit" in v and len(v) == 2:
+            return f"{v['value']}{v['unit']}"
+        # pair style: {"a": 1.2, "b": 0.3}
+        if "a" in v and "b" in v and len(v) == 2:
+            return f"{v['a']}/{v['b']}"
+        # generic dict
+        return json.dumps(v, separators=(",", ":"), ensure_ascii=False)
+    if isinstance(v, list):
+        # Lists are mostly plain strings (flags, items): only recurse for the rest
+        return ",".join([x if type(x) is str else fmt_value(x) for x in v])
+    return str(v)
+
+
+def has_flag(sock: Dict[str, Any], flag: str) -> bool:
+    metrics = sock.get("metrics", {}) or {}
+    flags = metrics.get("flags", []) or []
+    return flag in flags
+
+
+def ellipsize(s: str, width: int) -> str:
+    if width <= 0:
+        return ""
+    if len(s) <= width:
+        return s
+    if width <= 1:
+        return s[:width]
+    return s[: width - 1] + "…"
+
+
+def dump_json(obj: Any) -> bytes:
+    """Indented UTF-8 JSON; orjson builds the bytes in one pass when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+WIDE_HEADERS = [
+    "#", "State", "Local", "Peer", "CC",
+    "rtt", "cwnd", "send", "pacing_rate", "delivery_rate",
+    "bytes_sent", "bytes_recv", "minrtt", "bbr_bw", "bbr_mrtt", "Flags",
+]
+NARROW_HEADERS = [
+    "#", "State", "Local", "Peer", "CC",
+    "rtt", "cwnd", "send", "delivery_rate", "bbr_bw", "Flags",
+]
+
+
+def _wide_row(i: int, s: Dict[str, Any]) -> List[str]:
+    # Each level looked up once per socket; a missing one reads as {}
+    metrics = s.get("metrics") or {}
+    bbr = (metrics.get("groups") or {}).get("bbr") or {}
+    return [
+        str(i),
+        str(s.get("state", "")),
+        (s.get("local") or {}).get("raw") or "",
+        (s.get("peer") or {}).get("raw") or "",
+        fmt_value(metrics.get("cc", "")),
+        fmt_value(metrics.get("rtt", "")),
+        fmt_value(metrics.get("cwnd", "")),
+        fmt_value(metrics.get("send", "")),
+        fmt_value(metrics.get("pacing_rate", "")),
+        fmt_value(metrics.get("delivery_rate", "")),
+        fmt_value(metrics.get("bytes_sent", "")),
+        fmt_value(metrics.get("bytes_received", "")),
+        fmt_value(metrics.get("minrtt", "")),
+        fmt_value(bbr.get("bw", "")),
+        fmt_value(bbr.get("mrtt", "")),
+        ",".join([f if type(f) is str else str(f) for f in (metrics.get("flags") or ())]),
+    ]
+
+
+def _narrow_row(i: int, s: Dict[str, Any]) -> List[str]:
+    metrics = s.get("metrics") or {}
+    bbr = (metrics.get("groups") or {}).get("bbr") or {}
+    return [
+        str(i),
+        str(s.get("state", "")),
+        (s.get("local") or {}).get("raw") or "",
+        (s.get("peer") or {}).get("raw") or "",
+        fmt_value(metrics.get("cc", "")),
+        fmt_value(metrics.get("rtt", "")),
+        fmt_value(metrics.get("cwnd", "")),
+        fmt_value(metrics.get("send", "")),
+        fmt_value(metrics.get("delivery_rate", "")),
+        fmt_value(bbr.get("bw", "")),
+        ",".join([f if type(f) is str else str(f) for f in (metrics.get("flags") or ())]),
+    ]
+
+
+def build_rows(parsed: Dict[str, Any], wide: bool) -> Tuple[List[str], List[List[str]]]:
+    sockets: List[Dict[str, Any]] = parsed.get("sockets", []) or []
+
+    # One row builder per layout, picked once: no per-socket branch on `wide`,
+    # and narrow rows skip formatting the columns they do not show
+    if wide:
+        headers, row_fn = WIDE_HEADERS, _wide_row
+    else:
+        headers, row_fn = NARROW_HEADERS, _narrow_row
+
+    rows: List[List[str]] = [row_fn(i, s) for i, s in enumerate(sockets)]
+    return list(headers), rows
+
+
+# Columns print_table may narrow to fit the terminal, in the order it takes
+# from them, and the widths it stops at (6 for any other column)
+_SHRINK_HEADERS = ("Local", "Peer", "Flags", "bytes_sent", "bytes_recv", "pacing_rate", "delivery_rate", "send", "rtt")
+_MIN_WIDTHS = (("Local", 18), ("Peer", 18), ("Flags", 8))
+
+
+@functools.lru_cache(maxsize=None)
+def _shrink_plan(headers: Tuple[str, ...]) -> Tuple[Tuple[int, ...], Dict[int, int]]:
+    """(shrink_order, min_width) by column index, worked out once per header row."""
+    shrink_order = tuple(headers.index(h) for h in _SHRINK_HEADERS if h in headers)
+    min_width = {i: 6 for i in range(len(headers))}
+    for h, w in _MIN_WIDTHS:
+        if h in headers:
+            min_width[headers.index(h)] = w
+    return shrink_order, min_width
+
+
+# Column caps for print_table. Tweak if you want.
+CAP_BY_HEADER = {
+    "#": 4,
+    "State": 7,
+    "Local": 34,
+    "Peer": 34,
+    "CC": 6,
+    "rtt": 14,
+    "cwnd": 8,
+    "send": 14,
+    "pacing_rate": 16,
+    "delivery_rate": 16,
+    "bytes_sent": 12,
+    "bytes_recv": 12,
+    "minrtt": 12,
+    "bbr_bw": 16,
+    "bbr_mrtt": 10,
+    "Flags": 18,
+}
+
+
+def print_table(
+    headers: List[str], rows: List[List[str]], cap_by_header: Optional[Dict[str, int]] = None
+) -> None:
+    term_w = shutil.get_terminal_size((140, 20)).columns
+    if cap_by_header is None:
+        cap_by_header = CAP_BY_HEADER
+
+    # Compute initial widths from data, then cap them
+    cols = len(headers)
+    # Longest cell per column, one zip/map pass over the rows
+    max_cells = [max(map(len, col)) for col in zip(*rows)] or [0] * cols
+    widths: List[int] = []
+    for header, max_cell in zip(headers, max_cells):
+        w = max(len(header), max_cell)
+        w = min(w, cap_by_header.get(header, w))
+        widths.append(w)
+
+    # If too wide, progressively shrink Local, Peer, Flags, then others
+    def total_width(ws: List[int]) -> int:
+        # " | " separators between columns
+        return sum(ws) + 3 * (len(ws) - 1)
+
+    shrink_order, min_width = _shrink_plan(tuple(headers))
+
+    # Same result as taking one char at a time from each column in
+    # shrink_order, round after round, until the table fits (or nothing is
+    # left to take), worked out per column instead of per char
+    excess = total_width(widths) - term_w
+    if excess > 0 and shrink_order:
+        room = [max(0, widths[idx] - min_width.get(idx, 6)) for idx in shrink_order]
+        rounds = 0
+        for level in sorted(set(room)):
+            if level <= rounds:
+                continue
+            active = sum(1 for r in room if r > rounds)  # columns still shrinking
+            n = min(level - rounds, excess // active)
+            rounds += n
+            excess -= n * active
+            if rounds < level:
+                break
+        # A last, partial round: the first `excess` columns with room left
+        for j, idx in enumerate(shrink_order):
+            take = min(room[j], rounds)
+            if excess > 0 and room[j] > rounds:
+                take += 1
+                excess -= 1
+            widths[idx] -= take
+
+    # Render. Only columns narrower than their longest cell need ellipsize();
+    # each row is then padded and joined by a single format string
+    header_line = " | ".join(ellipsize(h, widths[i]).ljust(widths[i]) for i, h in enumerate(headers))
+    sep_line = "-+-".join("-" * widths[i] for i in range(cols))
+    lines = [header_line, sep_line]
+    row_fmt = " | ".join(f"{{:<{w}}}" for w in widths).format
+    clipped = [(i, widths[i]) for i in range(cols) if widths[i] < max_cells[i]]
+    if clipped:
+        for r in rows:
+            r = list(r)
+            for i, w in clipped:
+                r[i] = ellipsize(r[i], w)
+            lines.append(row_fmt(*r))
+    else:
+        lines.extend([row_fmt(*r) for r in rows])
+
+    # The whole table in one write
+    sys.stdout.write("\n".join(lines) + "\n")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Long-lived command runner for one Mininet host.
+
+Started once inside a host's namespace (sudo python3 topo_h1.py N --host-daemon),
+it listens on a Unix socket and runs each requested command there, so callers
+skip the m -> bash -> nsenter startup for every iperf3 launch.
+
+Protocol, one request per connection:
+    -> {"argv": [...], "stderr": "/path/to/log"}\n     ("stderr" is optional)
+    <- {"rc": <exit status>}\n                          (once the command exits)
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+
+
+def recv_line(conn) -> bytes:
+    buf = b""
+    while not buf.endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        buf += chunk
+    return buf
+
+
+def run_request(raw: bytes) -> int:
+    try:
+        req = json.loads(raw)
+        argv = [str(a) for a in req["argv"]]
+        err_path = req.get("stderr")
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"bad request {raw[:200]!r}: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        if err_path:
+            with open(err_path, "ab") as err:
+                return subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=err).returncode
+        return subprocess.run(argv, stdout=subprocess.DEVNULL).returncode
+    except OSError as e:
+        print(f"cannot run {argv}: {e}", file=sys.stderr)
+        return 127
+
+
+def handle(conn):
+    with conn:
+        raw = recv_line(conn)
+        if not raw:
+            return
+        rc = run_request(raw)
+        try:
+            conn.sendall(json.dumps({"rc": rc}).encode() + b"\n")
+        except OSError:
+            pass  # client went away; nothing to report to
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run commands for one Mininet host over a Unix socket")
+    ap.add_argument("socket", help="socket path, e.g. /var/run/aqm_cca/hs1.sock")
+    args = ap.parse_args()
+
+    # SIGTERM from the topology on shutdown: leave through the finally below
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    try:
+        os.unlink(args.socket)  # stale socket from an earlier run
+    except FileNotFoundError:
+        pass
+
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        srv.bind(args.socket)
+        srv.listen(128)
+        while True:
+            conn, _ = srv.accept()
+            # One thread per request: a host may run several commands at once
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+    finally:
+        srv.close()
+        try:
+            os.unlink(args.socket)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@
 qdisc_table_logger.py
 
 Every second:
-  - runs: tc -j -s qdisc show dev <iface>
+  - reads the root qdisc stats of <iface> over one long-lived netlink socket
+    (pyroute2), or runs tc -j -s qdisc show dev <iface> without it / with --tc
   - prints a table row with fields like your tc JSON output
   - appends JSON lines to a per-run file in the current directory
 
@@ -13,12 +14,32 @@ Run (usually needs sudo):
 
 import argparse
 import json
+import struct
 import subprocess
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from pyroute2 import IPRoute
+except ImportError:
+    IPRoute = None
+
+TC_H_ROOT = 0xFFFFFFFF
+STAT_KEYS = ("bytes", "packets", "drops", "overlimits", "requeues", "backlog", "qlen")
+# Parts of the tc -j object that do not change from tick to tick
+STATIC_KEYS = ("kind", "handle", "root", "refcnt", "options")
+
+# TCA_XSTATS payload per kind: struct tc_fq_codel_xstats / tc_red_xstats,
+# all __u32, under the names tc -j -s prints them with. fq_codel's first
+# field is the xstats type (0 = qdisc stats); older kernels send fewer fields
+XSTATS_FIELDS = {
+    "fq_codel": ("type", "maxpacket", "drop_overlimit", "ecn_mark", "new_flow_count",
+                 "new_flows_len", "old_flows_len", "ce_mark", "memory_used", "drop_overmemory"),
+    "red": ("early", "pdrop", "other", "marked"),
+}
+
 
 def run_tc(iface: str):
     cmd = ["tc", "-j", "-s", "qdisc", "show", "dev", iface]
@@ -42,6 +63,89 @@ def select_root_qdisc(arr):
     return {}
 
 
+def attr_bytes(msg, name):
+    """Raw payload of netlink attribute `name` in msg, or None."""
+    for slot in msg["attrs"]:
+        if slot[0] != name:
+            continue
+        value = slot[1]
+        if isinstance(value, str):
+            # pyroute2 hands undecoded attributes over as "aa:bb:..." hex
+            return bytes.fromhex(value.replace(":", ""))
+        return bytes(value.data[value.offset + 4:value.offset + value.length])
+    return None
+
+
+def decode_xstats(kind, raw):
+    """The XSTATS_FIELDS counters of one TCA_XSTATS payload ({} if unknown)."""
+    fields = XSTATS_FIELDS.get(kind)
+    if not fields or not raw:
+        return {}
+    n = min(len(fields), len(raw) // 4)
+    xstats = dict(zip(fields, struct.unpack_from(f"={n}I", raw)))
+    if kind == "fq_codel" and xstats.pop("type", None) != 0:
+        return {}  # class stats, not the qdisc's
+    return xstats
+
+
+class NetlinkQdisc:
+    """
+    Root qdisc of one interface, polled with RTM_GETQDISC on a persistent
+    netlink socket instead of a tc fork per tick. Returns the tc -j dict
+    shape: the counters come from TCA_STATS2 and the AQM counters of
+    XSTATS_FIELDS from TCA_XSTATS every call, while the STATIC_KEYS
+    (kind-specific "options" such as tbf rate/burst/lat, ...) that tc
+    decodes are taken from one tc call, repeated only when the root
+    kind/handle changes. Other per-tick xstats are not reported.
+    """
+
+    def __init__(self, ipr, iface):
+        idx = ipr.link_lookup(ifname=iface)
+        if not idx:
+            raise RuntimeError(f"no such interface: {iface}")
+        self.ipr = ipr
+        self.iface = iface
+        self.index = idx[0]
+        self.template = {}
+
+    def root_stats(self):
+        for msg in self.ipr.get_qdiscs(index=self.index):
+            if msg["parent"] != TC_H_ROOT:
+                continue
+            stats2 = msg.get_attr("TCA_STATS2")
+            if stats2 is None:
+                raise RuntimeError("root qdisc has no TCA_STATS2")
+            basic = stats2.get_attr("TCA_STATS_BASIC") or {}
+            queue = stats2.get_attr("TCA_STATS_QUEUE") or {}
+            stats = {k: basic.get(k, queue.get(k, 0)) for k in STAT_KEYS}
+            kind = msg.get_attr("TCA_KIND")
+            try:
+                stats.update(decode_xstats(kind, attr_bytes(msg, "TCA_XSTATS")))
+            except (ValueError, struct.error):
+                pass
+            return kind, f"{msg['handle'] >> 16:x}:", stats
+        return None, None, {}
+
+    def read(self):
+        kind, handle, stats = self.root_stats()
+        if kind is None:
+            return {}
+        if (self.template.get("kind"), self.template.get("handle")) != (kind, handle):
+            try:
+                q = select_root_qdisc(run_tc(self.iface))
+                self.template = {k: q[k] for k in STATIC_KEYS if k in q}
+            except (OSError, RuntimeError, ValueError):
+                self.template = {}
+            if (self.template.get("kind"), self.template.get("handle")) != (kind, handle):
+                self.template = {"kind": kind, "handle": handle, "root": True}
+        q = dict(self.template)
+        q.update(stats)
+        return q
+
+    def close(self):
+        self.ipr.close()
+
+
 def fmt_int(v, default=0):
     try:
         return int(v)
@@ -53,6 +157,8 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--iface", default="enp8s0")
     ap.add_argument("--interval", type=float, default=1.0)
+    ap.add_argument("--tc", action="store_true",
+                    help="run tc every tick even when pyroute2 is available")
     args = ap.parse_args()
 
     # Ensure prints show immediately
@@ -66,6 +172,19 @@ def main():
 
     print(f"Logging to: {out_file}")
 
+    read_qdisc = lambda: select_root_qdisc(run_tc(args.iface))
+    netlink = None
+    if IPRoute is not None and not args.tc:
+        ipr = None
+        try:
+            ipr = IPRoute()
+            netlink = NetlinkQdisc(ipr, args.iface)
+            read_qdisc = netlink.read
+        except Exception as e:
+            if ipr is not None:
+                ipr.close()
+            print(f"netlink unavailable ({e}); falling back to tc")
+
     # Table header (matches your JSON fields + options)
     header = (
         f"{'ts':<19} {'kind':<6} {'handle':<7} "
@@ -84,8 +203,7 @@ def main():
                 ts = datetime.now().isoformat(timespec="seconds")
 
                 try:
-                    arr = run_tc(args.iface)
-                    q = select_root_qdisc(arr)
+                    q = read_qdisc()
 
                     kind = q.get("kind", "-")
                     handle = q.get("handle", "-")
@@ -127,6 +245,9 @@ def main():
             print("\nStopped.")
             f.write(json.dumps({"end_ts": datetime.now().isoformat(), "iface": args.iface}) + "\n")
             f.flush()
+        finally:
+            if netlink is not None:
+                netlink.close()
 
 
 if __name__ == "__main__":
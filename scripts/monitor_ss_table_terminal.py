@@ -6,12 +6,24 @@ Shows a refreshed table (only output) summarizing `ss -tin` for each Mininet hos
 It runs commands like:
   mininet/util/m hs1 ss -tin
 
+or, with USE_SOCK_DIAG = True (needs root), asks each host's network namespace
+for the same tcp_info over a NETLINK_SOCK_DIAG socket, with no subprocesses.
+
 Stop with Ctrl+C
 """
 
-import re
+import asyncio
+import ctypes
+import os
+import socket
+import struct
+import sys
 import time
-import subprocess
+
+import numpy as np
+
+from _ss_info_scan import extract_ipport_tokens, keep_port, scan_info
+from _ss_summary_table import format_table
 
 # -------------------- CONFIG (hardcode here) --------------------
 NUM_HOSTS   = 16
@@ -21,65 +33,29 @@ REFRESH_S   = 0.1
 
 MN_M_CMD    = "/home/ubuntu/mininet/util/m"   # path to Mininet "m" helper
 USE_SUDO    = False              # set True if `m` requires sudo
+USE_SOCK_DIAG = False            # read tcp_info via netlink instead of `m ... ss -tin`
 # ---------------------------------------------------------------
 
 
 # -------------------- Command runner --------------------
-def run_cmd(cmd: str) -> str:
-    """Run a shell command and return stdout (no extra prints)."""
+async def read_host(host: str) -> str:
+    """`m <host> ss -tin` as a subprocess; stdout, or "" if it cannot run."""
+    argv = (["sudo"] if USE_SUDO else []) + [MN_M_CMD, host, "ss", "-tin"]
     try:
-        p = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        return p.stdout or ""
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        out, _ = await proc.communicate()
+        return out.decode(errors="replace")
     except Exception:
         return ""
 
-
-# -------------------- Parsing helpers --------------------
-def _find_int(text, key):
-    m = re.search(rf"\b{key}:(\d+)\b", text)
-    return int(m.group(1)) if m else None
-
-def _find_float(text, key):
-    m = re.search(rf"\b{key}:(\d+(?:\.\d+)?)\b", text)
-    return float(m.group(1)) if m else None
-
-def _find_rtt(text):
-    # rtt:22.876/10.763
-    m = re.search(r"\brtt:(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?)\b", text)
-    if not m:
-        return None, None
-    return float(m.group(1)), float(m.group(2))
-
-def _find_rate_bps(text, key):
-    # send 8988984bps, pacing_rate 22604480bps, delivery_rate 794488bps
-    m = re.search(rf"\b{key}\s+(\d+)([KMG]?)bps\b", text)
-    if not m:
-        return None
-    val = float(m.group(1))
-    unit = m.group(2).upper()
-    scale = {"": 1.0, "K": 1e3, "M": 1e6, "G": 1e9}[unit]
-    return val * scale
-
-def _find_bbr_bw_bps(text):
-    # bbr:(bw:793952bps,mrtt:14.379,...)
-    m = re.search(r"bbr:\(.*?\bbw:(\d+)([KMG]?)bps", text)
-    if not m:
-        return None
-    val = float(m.group(1))
-    unit = m.group(2).upper()
-    scale = {"": 1.0, "K": 1e3, "M": 1e6, "G": 1e9}[unit]
-    return val * scale
-
-def _extract_ipport_tokens(header_line):
-    parts = header_line.split()
-    return [p for p in parts if ":" in p and re.search(r":\d+$", p)]
-
-def _keep_port(src, dst, port):
-    if port is None:
-        return True
-    return (src and src.endswith(f":{port}")) or (dst and dst.endswith(f":{port}"))
+async def read_all_hosts(hosts):
+    """All hosts' ss output, queried concurrently (one refresh ~ one host's latency)."""
+    return await asyncio.gather(*(read_host(h) for h in hosts))
 
 
+# -------------------- Parsing helpers --------------------
 def parse_ss_tin_output(ss_text, port_filter=None):
     """
     Parse `ss -tin` output into a list of per-flow dicts.
@@ -99,33 +75,33 @@ def parse_ss_tin_output(ss_text, port_filter=None):
         header = lines[i]
         info = lines[i + 1] if i + 1 < len(lines) else ""
 
-        ipports = _extract_ipport_tokens(header)
+        ipports = extract_ipport_tokens(header)
         src = ipports[0] if len(ipports) >= 1 else None
         dst = ipports[1] if len(ipports) >= 2 else None
 
-        if not _keep_port(src, dst, port_filter):
+        if not keep_port(src, dst, port_filter):
             i += 2
             continue
 
         tokens = info.split()
         cc = tokens[0] if tokens else None
 
-        rtt_ms, _ = _find_rtt(info)
+        vals = scan_info(info)
 
         flows.append({
             "src": src,
             "dst": dst,
             "cc": cc,
-            "rtt_ms": rtt_ms,
-            "minrtt_ms": _find_float(info, "minrtt"),
-            "cwnd": _find_int(info, "cwnd"),
-            "mss": _find_int(info, "mss"),
-            "rto": _find_int(info, "rto"),
-            "bytes_acked": _find_int(info, "bytes_acked"),
-            "send_bps": _find_rate_bps(info, "send"),
-            "pacing_bps": _find_rate_bps(info, "pacing_rate"),
-            "delivery_bps": _find_rate_bps(info, "delivery_rate"),
-            "bbr_bw_bps": _find_bbr_bw_bps(info),
+            "rtt_ms": vals.get("rtt_ms"),
+            "minrtt_ms": vals.get("minrtt_ms"),
+            "cwnd": vals.get("cwnd"),
+            "mss": vals.get("mss"),
+            "rto": vals.get("rto"),
+            "bytes_acked": vals.get("bytes_acked"),
+            "send_bps": vals.get("send_bps"),
+            "pacing_bps": vals.get("pacing_bps"),
+            "delivery_bps": vals.get("delivery_bps"),
+            "bbr_bw_bps": vals.get("bbr_bw_bps"),
         })
 
         i += 2
@@ -133,6 +109,140 @@ def parse_ss_tin_output(ss_text, port_filter=None):
     return flows
 
 
+# -------------------- Netlink (SOCK_DIAG) collector --------------------
+# What `ss -tin` does internally: one inet_diag dump per refresh, tcp_info
+# read as a binary struct instead of being printed and parsed back.
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLM_F_REQUEST, NLM_F_DUMP = 0x1, 0x300
+NLMSG_ERROR, NLMSG_DONE = 2, 3
+INET_DIAG_INFO, INET_DIAG_VEGASINFO, INET_DIAG_CONG, INET_DIAG_BBRINFO = 2, 3, 4, 16
+TCP_ESTABLISHED = 1
+CLONE_NEWNET = 0x40000000
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_DIAG_REQ = struct.Struct("=BBBxI48x")    # inet_diag_req_v2, empty sockid
+_DIAG_MSG = struct.Struct("=BBBB2s2s16s16s")  # inet_diag_msg up to the addresses
+_DIAG_MSG_LEN = 72
+_RTATTR = struct.Struct("=HH")
+# struct tcp_info: rto, snd_mss at 8/16; rtt, snd_cwnd at 68/80;
+# pacing_rate, bytes_acked at 104/120; min_rtt at 148; delivery_rate at 160
+_TI_RTO, _TI_MSS, _TI_RTT, _TI_CWND = (struct.Struct(f"={o}xI") for o in (8, 16, 68, 80))
+_TI_PACING, _TI_ACKED, _TI_DELIVERY = (struct.Struct(f"={o}xQ") for o in (104, 120, 160))
+_TI_MINRTT = struct.Struct("=148xI")
+_BBR_BW = struct.Struct("=II")            # tcp_bbr_info: bw_lo, bw_hi (bytes/s)
+
+
+def _setns(fd):
+    if hasattr(os, "setns"):
+        os.setns(fd, CLONE_NEWNET)
+        return
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.setns(fd, CLONE_NEWNET) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+def find_host_pid(host):
+    """PID of the Mininet shell for `host` (bash ... mininet:<host>), as `m` finds it."""
+    tag = f"mininet:{host}".encode()
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/cmdline", "rb") as fh:
+                argv = fh.read().split(b"\0")
+        except OSError:
+            continue
+        if tag in argv:
+            return int(entry.name)
+    raise LookupError(f"no Mininet shell found for {host}")
+
+
+def open_diag_socket(host):
+    """A NETLINK_SOCK_DIAG socket living in `host`'s network namespace."""
+    own_ns = os.open("/proc/self/ns/net", os.O_RDONLY)
+    host_ns = os.open(f"/proc/{find_host_pid(host)}/ns/net", os.O_RDONLY)
+    try:
+        _setns(host_ns)
+        try:
+            # A socket stays in the namespace it was created in
+            return socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_SOCK_DIAG)
+        finally:
+            _setns(own_ns)
+    finally:
+        os.close(host_ns)
+        os.close(own_ns)
+
+
+def _diag_flow(msg):
+    """parse_ss_tin_output()-style flow dict from one inet_diag_msg payload."""
+    _, _, _, _, sport, dport, src, dst = _DIAG_MSG.unpack_from(msg)
+    flow = {
+        "src": f"{socket.inet_ntoa(src[:4])}:{int.from_bytes(sport, 'big')}",
+        "dst": f"{socket.inet_ntoa(dst[:4])}:{int.from_bytes(dport, 'big')}",
+        "cc": None, "rtt_ms": None, "minrtt_ms": None, "cwnd": None, "mss": None,
+        "rto": None, "bytes_acked": None, "send_bps": None, "pacing_bps": None,
+        "delivery_bps": None, "bbr_bw_bps": None,
+    }
+
+    off = _DIAG_MSG_LEN
+    while off + _RTATTR.size <= len(msg):
+        alen, atype = _RTATTR.unpack_from(msg, off)
+        if alen < _RTATTR.size:
+            break
+        data = msg[off + _RTATTR.size:off + alen]
+        if atype == INET_DIAG_INFO and len(data) >= _TI_DELIVERY.size:
+            (rtt_us,) = _TI_RTT.unpack_from(data)
+            (cwnd,) = _TI_CWND.unpack_from(data)
+            (mss,) = _TI_MSS.unpack_from(data)
+            flow["rto"] = _TI_RTO.unpack_from(data)[0] // 1000
+            flow["mss"] = mss
+            flow["cwnd"] = cwnd
+            flow["rtt_ms"] = rtt_us / 1000.0
+            flow["minrtt_ms"] = _TI_MINRTT.unpack_from(data)[0] / 1000.0
+            flow["bytes_acked"] = _TI_ACKED.unpack_from(data)[0]
+            flow["pacing_bps"] = _TI_PACING.unpack_from(data)[0] * 8.0
+            flow["delivery_bps"] = _TI_DELIVERY.unpack_from(data)[0] * 8.0
+            if rtt_us:
+                # Same estimate ss prints as "send": cwnd * mss / rtt
+                flow["send_bps"] = cwnd * mss * 8.0 * 1e6 / rtt_us
+        elif atype == INET_DIAG_CONG:
+            flow["cc"] = data.split(b"\0", 1)[0].decode(errors="replace") or None
+        elif atype == INET_DIAG_BBRINFO and len(data) >= _BBR_BW.size:
+            lo, hi = _BBR_BW.unpack_from(data)
+            flow["bbr_bw_bps"] = ((hi << 32) | lo) * 8.0
+        off += (alen + 3) & ~3
+    return flow
+
+
+def diag_flows(sock, port_filter=None):
+    """
+    Established IPv4 TCP flows in the socket's namespace, in the same
+    format as parse_ss_tin_output().
+    """
+    ext = (1 << (INET_DIAG_INFO - 1)) | (1 << (INET_DIAG_VEGASINFO - 1)) | (1 << (INET_DIAG_CONG - 1))
+    req = _DIAG_REQ.pack(socket.AF_INET, socket.IPPROTO_TCP, ext, 1 << TCP_ESTABLISHED)
+    sock.send(_NLMSGHDR.pack(_NLMSGHDR.size + len(req), SOCK_DIAG_BY_FAMILY,
+                             NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + req)
+
+    flows = []
+    while True:
+        buf = sock.recv(1 << 16)
+        off = 0
+        while off + _NLMSGHDR.size <= len(buf):
+            mlen, mtype, _, _, _ = _NLMSGHDR.unpack_from(buf, off)
+            if mlen < _NLMSGHDR.size or mtype == NLMSG_DONE:
+                return flows
+            if mtype == NLMSG_ERROR:
+                (errno,) = struct.unpack_from("=i", buf, off + _NLMSGHDR.size)
+                raise OSError(-errno, os.strerror(-errno))
+            flow = _diag_flow(buf[off + _NLMSGHDR.size:off + mlen])
+            if keep_port(flow["src"], flow["dst"], port_filter):
+                flows.append(flow)
+            off += (mlen + 3) & ~3
+
+
 # -------------------- Summaries + formatting --------------------
 def mean(vals):
     vals = [v for v in vals if v is not None]
@@ -149,16 +259,6 @@ def dominant_cc(ccs):
 def bps_to_mbps(x):
     return None if x is None else (x / 1e6)
 
-def fmt_float(x, w=9, p=2):
-    return f"{'-':>{w}}" if x is None else f"{x:>{w}.{p}f}"
-
-def fmt_int(x, w=6):
-    return f"{'-':>{w}}" if x is None else f"{int(x):>{w}}"
-
-def fmt_bps(x, w=12):
-    return f"{'-':>{w}}" if x is None else f"{x:>{w}.3e}"
-
-
 def summarize_host(flows, ack_rate_bps):
     send_bps    = sum_or_none([f["send_bps"] for f in flows])
     pacing_bps  = mean([f["pacing_bps"] for f in flows])
@@ -188,66 +288,57 @@ def summarize_host(flows, ack_rate_bps):
 
 
 # -------------------- Terminal table (only output) --------------------
-def clear_screen():
-    print("\033[2J\033[H", end="")  # ANSI clear + home
+CLEAR_HOME = "\033[2J\033[H"  # ANSI clear + home
 
 def print_table(rows):
-    header = (
-        f"{'Host':<5} {'#F':>3} {'CC':<5} "
-        f"{'RTT':>7} {'minRTT':>7} {'cwnd':>6} {'MSS':>5} {'RTO':>5} "
-        f"{'Send(M)':>9} {'Send(bps)':>12} "
-        f"{'ACK(M)':>9} {'ACK(bps)':>12} "
-        f"{'Pace(M)':>9} {'Del(M)':>9} {'BBRbw(M)':>9}"
-    )
-    print(header)
-    print("-" * len(header))
-    for r in rows:
-        print(
-            f"{r['host']:<5} {r['flows']:>3} {r['cc']:<5} "
-            f"{fmt_float(r['avg_rtt'],7,2)} {fmt_float(r['min_rtt'],7,2)} "
-            f"{fmt_float(r['avg_cwnd'],6,1)} {fmt_int(r['mss'],5)} {fmt_float(r['rto'],5,0)} "
-            f"{fmt_float(r['send_mbps'],9,2)} {fmt_bps(r['send_bps'],12)} "
-            f"{fmt_float(r['ack_mbps'],9,2)} {fmt_bps(r['ack_bps'],12)} "
-            f"{fmt_float(r['pacing_mbps'],9,2)} {fmt_float(r['delivery_mbps'],9,2)} {fmt_float(r['bbr_bw_mbps'],9,2)}"
-        )
+    """Clear the screen and draw the table with a single write."""
+    sys.stdout.write(CLEAR_HOME + format_table(rows))
+    sys.stdout.flush()
 
 
 # -------------------- Main loop --------------------
 def monitor():
-    prev_acked = {}  # host -> last total bytes_acked
-    prev_time  = {}  # host -> timestamp
+    hosts = [f"{HOST_PREFIX}{i}" for i in range(1, NUM_HOSTS + 1)]
 
-    while True:
-        rows = []
-        now = time.time()
-
-        for i in range(1, NUM_HOSTS + 1):
-            host = f"{HOST_PREFIX}{i}"
-
-            sudo = "sudo " if USE_SUDO else ""
-            cmd = f"{sudo}{MN_M_CMD} {host} ss -tin"
-            ss_text = run_cmd(cmd)
-            #sprint(cmd)
+    # Per-host ACK bookkeeping, indexed like hosts; -1 = no sample yet
+    prev_acked = np.full(len(hosts), -1, dtype=np.int64)      # last total bytes_acked
+    prev_time = np.full(len(hosts), time.time(), dtype=np.float64)
 
-            flows = parse_ss_tin_output(ss_text, port_filter=IPERF_PORT)
+    if USE_SOCK_DIAG:
+        diag_socks = {h: open_diag_socket(h) for h in hosts}
 
-            # ACK progress rate (bits/s)
-            total_bytes_acked = sum_or_none([f["bytes_acked"] for f in flows]) or 0
-            last_bytes = prev_acked.get(host, total_bytes_acked)
-            last_t = prev_time.get(host, now)
+    while True:
+        if not USE_SOCK_DIAG:
+            # Every host's `m ... ss -tin` in flight at once
+            texts = asyncio.run(read_all_hosts(hosts))
+        now = time.time()
 
-            dt = max(1e-6, now - last_t)
-            delta_bytes = max(0, total_bytes_acked - last_bytes)
-            ack_rate_bps = (delta_bytes * 8.0) / dt
+        per_host = []
+        for k, host in enumerate(hosts):
+            if USE_SOCK_DIAG:
+                per_host.append(diag_flows(diag_socks[host], port_filter=IPERF_PORT))
+            else:
+                per_host.append(parse_ss_tin_output(texts[k], port_filter=IPERF_PORT))
+
+        # ACK progress rate (bits/s) for all hosts at once; a host's first
+        # sample counts as no progress
+        total_acked = np.array(
+            [sum_or_none([f["bytes_acked"] for f in flows]) or 0 for flows in per_host],
+            dtype=np.int64,
+        )
+        last_acked = np.where(prev_acked < 0, total_acked, prev_acked)
+        dt = np.maximum(1e-6, now - prev_time)
+        ack_rates = np.maximum(0, total_acked - last_acked) * 8.0 / dt
 
-            prev_acked[host] = total_bytes_acked
-            prev_time[host] = now
+        prev_acked[:] = total_acked
+        prev_time[:] = now
 
+        rows = []
+        for host, flows, ack_rate_bps in zip(hosts, per_host, ack_rates.tolist()):
             s = summarize_host(flows, ack_rate_bps)
             s["host"] = host
             rows.append(s)
 
-        clear_screen()
         print_table(rows)
         time.sleep(REFRESH_S)
 
@@ -4,33 +4,119 @@ import re
 import subprocess
 import socket as pysocket
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
 RE_HEADER = re.compile(
     r"^(?P<state>\S+)\s+(?P<recvq>\d+)\s+(?P<sendq>\d+)\s+(?P<local>\S+)\s+(?P<peer>\S+)(?:\s+(?P<proc>.*))?$"
 )
 
-RE_PAREN_GROUP = re.compile(r"(?P<name>[A-Za-z0-9_]+):\((?P<body>[^)]*)\)")
-RE_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Character classes for the hand-written token scanner below (ASCII only,
+# like everything ss prints)
+_DIGITS = frozenset("0123456789")
+_UNIT_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz%/")
+_NAME_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_")
 
-RE_INT = re.compile(r"^[+-]?\d+$")
-RE_FLOAT = re.compile(r"^[+-]?(?:\d+\.\d*|\d*\.\d+|\d+)$")
-RE_NUM_UNIT = re.compile(r"^([+-]?(?:\d+\.\d*|\d*\.\d+|\d+))([A-Za-z%/]+)$")
+
+def _scan_number(s: str) -> Tuple[int, bool]:
+    """
+    Length of the leading [+-]?(digits[.digits] | .digits) of s (0 if there
+    is none) and whether it contains a '.'.
+    """
+    n = len(s)
+    i = 1 if n and s[0] in "+-" else 0
+    start = i
+    while i < n and s[i] in _DIGITS:
+        i += 1
+    whole = i - start
+    if i < n and s[i] == ".":
+        j = i + 1
+        while j < n and s[j] in _DIGITS:
+            j += 1
+        if whole or j > i + 1:
+            return j, True
+        return 0, False
+    return (i, False) if whole else (0, False)
+
+
+def _is_number(s: str) -> bool:
+    end, _ = _scan_number(s)
+    return end > 0 and end == len(s)
+
+
+def _num_unit(s: str) -> Optional[Tuple[str, str]]:
+    """(number, unit) for tokens like 51677ms / 12.5Mbps / 3%, else None."""
+    end, _ = _scan_number(s)
+    if end == 0 or end == len(s):
+        return None
+    unit = s[end:]
+    if all(ch in _UNIT_CHARS for ch in unit):
+        return s[:end], unit
+    return None
+
+
+def _to_number(s: str):
+    return float(s) if "." in s else int(s)
 
 
-def split_blocks(ss_output: str) -> List[Tuple[str, List[str]]]:
+def _is_identifier(s: str) -> bool:
+    # For ASCII strings this is exactly [A-Za-z_][A-Za-z0-9_]*
+    return s.isascii() and s.isidentifier()
+
+
+def _split_paren_groups(text: str) -> Tuple[Dict[str, str], str]:
+    """
+    Finds name:(body) groups (name = [A-Za-z0-9_]+, body has no ')').
+    Returns ({name: body}, text with the groups cut out).
+    """
+    groups: Dict[str, str] = {}
+    pieces: List[str] = []
+    pos = 0
+    k = text.find(":(")
+    while k != -1:
+        close = text.find(")", k + 2)
+        if close == -1:
+            break
+        start = k
+        while start > pos and text[start - 1] in _NAME_CHARS:
+            start -= 1
+        if start == k:
+            # no name right before ':('
+            k = text.find(":(", k + 1)
+            continue
+        groups[text[start:k]] = text[k + 2:close]
+        pieces.append(text[pos:start])
+        pos = close + 1
+        k = text.find(":(", pos)
+
+    if not groups:
+        return groups, text
+    pieces.append(text[pos:])
+    return groups, "".join(pieces)
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Lines of text, one slice at a time (no full splitlines() list)."""
+    pos = 0
+    n = len(text)
+    while pos < n:
+        end = text.find("\n", pos)
+        if end == -1:
+            end = n
+        yield text[pos:end]
+        pos = end + 1
+
+
+def split_blocks(ss_output: str) -> Iterator[Tuple[str, List[str]]]:
     """
     Blocks start at a non-indented line (socket header) and include following indented lines.
     Skips the top table header row that begins with 'State'.
+    Yields each (header, cont_lines) as soon as the next header closes it.
     """
-    lines = [ln.rstrip("\n") for ln in ss_output.splitlines()]
-    blocks: List[Tuple[str, List[str]]] = []
-
     cur_header: Optional[str] = None
     cur_cont: List[str] = []
 
-    for ln in lines:
+    for ln in _iter_lines(ss_output):
         if not ln.strip():
             continue
         if ln.lstrip().startswith("State "):
@@ -41,17 +127,15 @@ def split_blocks(ss_output: str) -> List[Tuple[str, List[str]]]:
                 cur_cont.append(ln.strip())
             else:
                 # stray continuation, keep anyway
-                blocks.append(("", [ln.strip()]))
+                yield "", [ln.strip()]
         else:
             if cur_header is not None:
-                blocks.append((cur_header, cur_cont))
+                yield cur_header, cur_cont
             cur_header = ln.strip()
             cur_cont = []
 
     if cur_header is not None:
-        blocks.append((cur_header, cur_cont))
-
-    return blocks
+        yield cur_header, cur_cont
 
 
 def parse_ip_port(addr_port: str) -> Dict[str, Any]:
@@ -107,32 +191,25 @@ def coerce_value(s: str) -> Any:
         left, right = s.split("/", 1)
         left = left.strip()
         right = right.strip()
-        if RE_FLOAT.match(left) and RE_FLOAT.match(right):
-            a = float(left) if "." in left else int(left)
-            b = float(right) if "." in right else int(right)
-            return {"a": a, "b": b}
+        if _is_number(left) and _is_number(right):
+            return {"a": _to_number(left), "b": _to_number(right)}
 
     # comma list
     if "," in s and not any(ch in s for ch in "()[]{}"):
-        parts = [p.strip() for p in s.split(",") if p.strip() != ""]
-        if parts and all(RE_FLOAT.match(p) for p in parts):
-            out = [float(p) if "." in p else int(p) for p in parts]
-            return out
+        parts = [p for p in (p.strip() for p in s.split(",")) if p]
+        if parts and all(_is_number(p) for p in parts):
+            return [_to_number(p) for p in parts]
         return parts
 
     # int or float
-    if RE_INT.match(s):
-        return int(s)
-    if RE_FLOAT.match(s):
-        return float(s)
+    end, has_dot = _scan_number(s)
+    if end == len(s):
+        return float(s) if has_dot else int(s)
 
     # number with unit
-    m = RE_NUM_UNIT.match(s)
-    if m:
-        num_str = m.group(1)
-        unit = m.group(2)
-        num = float(num_str) if "." in num_str else int(num_str)
-        return {"value": num, "unit": unit}
+    nu = _num_unit(s)
+    if nu is not None:
+        return {"value": _to_number(nu[0]), "unit": nu[1]}
 
     return s
 
@@ -147,7 +224,7 @@ def parse_paren_body(body: str) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
 
     # Most blobs in ss -tin are comma-separated key:value
-    parts = [p.strip() for p in body.split(",") if p.strip()]
+    parts = [p for p in (p.strip() for p in body.split(",")) if p]
     for p in parts:
         if ":" in p:
             k, v = p.split(":", 1)
@@ -173,55 +250,50 @@ def parse_metrics(lines: List[str]) -> Dict[str, Any]:
     if not text:
         return metrics
 
-    # Extract and remove name:(...) groups first
-    paren_groups = {}
-    for m in RE_PAREN_GROUP.finditer(text):
-        name = m.group("name")
-        body = m.group("body")
-        paren_groups[name] = parse_paren_body(body)
-
-    if paren_groups:
-        metrics["groups"] = paren_groups
-        # remove these groups from token stream so we do not double parse
-        text_wo_groups = RE_PAREN_GROUP.sub("", text).strip()
-    else:
-        text_wo_groups = text
+    # Extract and remove name:(...) groups first, so the token stream below
+    # does not parse them twice
+    raw_groups, text_wo_groups = _split_paren_groups(text)
+    if raw_groups:
+        metrics["groups"] = {name: parse_paren_body(body) for name, body in raw_groups.items()}
 
-    tokens = [t for t in text_wo_groups.split() if t]
+    tokens = text_wo_groups.split()
 
     # First token is often CC name (bbr, cubic, reno, bbr2, bbr3)
-    if tokens and ":" not in tokens[0] and RE_IDENTIFIER.match(tokens[0]):
+    if tokens and ":" not in tokens[0] and _is_identifier(tokens[0]):
         metrics["cc"] = tokens[0]
         tokens = tokens[1:]
 
+    # A trailing "" sentinel keeps tokens[i + 1] in range for the last token;
+    # it is neither ":"-bearing nor a value, so it never gets consumed
+    n = len(tokens)
+    tokens.append("")
+
     i = 0
-    while i < len(tokens):
+    while i < n:
         t = tokens[i]
 
         # key:value
-        if ":" in t:
-            k, v = t.split(":", 1)
-            k = k.strip()
-            v = v.strip()
+        colon = t.find(":")
+        if colon != -1:
+            k = t[:colon].strip()
             if k:
-                metrics[k] = coerce_value(v)
+                metrics[k] = coerce_value(t[colon + 1:].strip())
             i += 1
             continue
 
-        # key value form (send 123bps, pacing_rate 123bps, etc)
-        if RE_IDENTIFIER.match(t) and (i + 1) < len(tokens):
+        ident = _is_identifier(t)
+
+        # key value form (send 123bps, pacing_rate 123bps, etc); a next
+        # token with ":" is a key:value of its own (wscale:...), not a value
+        if ident:
             nxt = tokens[i + 1]
-            # do not treat "wscale:..." style, already handled
-            if ":" not in nxt:
-                # if next token looks like a value, store as key value
-                looks_like_value = bool(RE_FLOAT.match(nxt) or RE_NUM_UNIT.match(nxt) or RE_INT.match(nxt))
-                if looks_like_value:
-                    metrics[t] = coerce_value(nxt)
-                    i += 2
-                    continue
+            if ":" not in nxt and (_is_number(nxt) or _num_unit(nxt) is not None):
+                metrics[t] = coerce_value(nxt)
+                i += 2
+                continue
 
         # flags (app_limited, ecn, etc)
-        if RE_IDENTIFIER.match(t):
+        if ident:
             metrics.setdefault("flags", []).append(t)
         else:
             metrics.setdefault("unparsed", []).append(t)
@@ -232,10 +304,9 @@ def parse_metrics(lines: List[str]) -> Dict[str, Any]:
 
 
 def parse_ss_tin_output(ss_tin_output: str) -> Dict[str, Any]:
-    blocks = split_blocks(ss_tin_output)
     sockets: List[Dict[str, Any]] = []
 
-    for header, cont in blocks:
+    for header, cont in split_blocks(ss_tin_output):
         if not header:
             continue
 
@@ -23,11 +23,11 @@ Then open:
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import re
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from functools import partial
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
@@ -52,6 +52,9 @@ except Exception as e:
     )
     raise SystemExit(1)
 
+from _ss_host_shell import HostShell, output_digest
+from _ss_table_common import dump_json
+
 
 def parse_host_list(hosts_csv: Optional[str], host_range: Optional[str], prefix: str) -> List[str]:
     if hosts_csv:
@@ -67,11 +70,39 @@ def parse_host_list(hosts_csv: Optional[str], host_range: Optional[str], prefix:
     raise SystemExit("Provide either --hosts hs1,hs2 or --range 1-8")
 
 
+# Host -> its persistent shell, reused by every collection; None = its first
+# shell failed (m without `bash -s` support), so it stays on the m calls
+_shells: Dict[str, Optional[HostShell]] = {}
+
+
+def looks_like_ss(out: str) -> bool:
+    return ("State" in out and "Recv-Q" in out and "Send-Q" in out) or ("ESTAB" in out)
+
+
 def run_ss_tin_on_host(m_path: str, host: str, timeout: int) -> Tuple[int, str, str]:
     """
-    Runs `ss -tin` in a Mininet host using `/home/ubuntu/mininet/util/m hs<i> ...`.
-    Tries a few invocation patterns since wrappers vary.
+    Runs `ss -tin` in a Mininet host, through the host's persistent shell when
+    that works; otherwise via `/home/ubuntu/mininet/util/m hs<i> ...`, trying
+    a few invocation patterns since wrappers vary (this also captures stderr
+    for the error file).
     """
+    first = host not in _shells
+    shell = _shells.get(host)
+    if first or shell is not None:
+        try:
+            if shell is None or not shell.alive():
+                shell = _shells[host] = HostShell(m_path, host)
+            rc, out = shell.run_ss(timeout)
+            if rc == 0 and looks_like_ss(out):
+                return rc, out, ""
+        except (OSError, ValueError):
+            # Dead, hung or garbled shell: closed here, so the next poll starts
+            # a new one; unless it was the host's first, then mark it None
+            if shell is not None:
+                shell.close()
+            if first:
+                _shells[host] = None
+
     attempts: List[List[str]] = [
         [m_path, host, "ss", "-tin"],
         [m_path, host, "bash", "-lc", "ss -tin"],
@@ -85,9 +116,7 @@ def run_ss_tin_on_host(m_path: str, host: str, timeout: int) -> Tuple[int, str,
             p = subprocess.run(cmd, text=True, capture_output=True, timeout=timeout, check=False)
             out = p.stdout or ""
             err = p.stderr or ""
-            looks_like_ss = ("State" in out and "Recv-Q" in out and "Send-Q" in out) or ("ESTAB" in out)
-
-            if p.returncode == 0 and looks_like_ss:
+            if p.returncode == 0 and looks_like_ss(out):
                 return p.returncode, out, err
 
             last_rc, last_out, last_err = p.returncode, out, err
@@ -99,19 +128,31 @@ def run_ss_tin_on_host(m_path: str, host: str, timeout: int) -> Tuple[int, str,
     return last_rc, last_out, last_err
 
 
-def atomic_write_text(path: Path, content: str) -> None:
+def atomic_write_bytes(path: Path, content: bytes) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(content, encoding="utf-8")
+    tmp.write_bytes(content)
     tmp.replace(path)
 
 
-def collect_and_write(hosts: List[str], m_path: str, out_dir: Path, timeout: int) -> Dict[str, Any]:
+# Host file path -> (digest of the ss output it was written from, n_sockets),
+# so an unchanged snapshot is neither re-parsed nor rewritten
+_last_written: Dict[str, Tuple[int, int]] = {}
+
+
+def collect_and_write(
+    hosts: List[str],
+    m_path: str,
+    out_dir: Path,
+    timeout: int,
+    pool: Optional[ThreadPoolExecutor] = None,
+) -> Dict[str, Any]:
     """
     Collects & writes:
       - {host}_ss_tin.json per host
       - index.json
     Returns index structure.
+    With a pool, the per-host ss calls run concurrently (results keep host order).
     """
     now = datetime.now(timezone.utc).isoformat()
 
@@ -121,11 +162,24 @@ def collect_and_write(hosts: List[str], m_path: str, out_dir: Path, timeout: int
         "hosts": [],
     }
 
-    for host in hosts:
-        rc, out, err = run_ss_tin_on_host(m_path, host, timeout=timeout)
+    run = partial(run_ss_tin_on_host, m_path, timeout=timeout)
+    results = pool.map(run, hosts) if pool is not None else map(run, hosts)
 
+    for host, (rc, out, err) in zip(hosts, results):
         record: Dict[str, Any]
         if rc == 0 and out.strip():
+            host_file = f"{host}_ss_tin.json"
+            key = str(out_dir / host_file)
+            digest = output_digest(out)
+            last = _last_written.get(key)
+            if last is not None and last[0] == digest:
+                # Same ss output as the file already on disk: leave it (and
+                # its Last-Modified) alone
+                index["hosts"].append(
+                    {"host": host, "file": host_file, "ok": True, "rc": rc, "n_sockets": last[1]}
+                )
+                continue
+
             parsed = parse_ss_tin_output(out)
             # Ensure host and capture time are present at top-level meta
             parsed_meta = parsed.get("meta", {}) if isinstance(parsed, dict) else {}
@@ -137,25 +191,26 @@ def collect_and_write(hosts: List[str], m_path: str, out_dir: Path, timeout: int
             record = parsed
             n_sockets = len(parsed.get("sockets", []) or []) if isinstance(parsed, dict) else 0
 
-            host_file = f"{host}_ss_tin.json"
-            atomic_write_text(out_dir / host_file, json.dumps(record, indent=2, ensure_ascii=False))
+            atomic_write_bytes(out_dir / host_file, dump_json(record))
+            _last_written[key] = (digest, n_sockets)
             index["hosts"].append(
                 {"host": host, "file": host_file, "ok": True, "rc": rc, "n_sockets": n_sockets}
             )
         else:
             # Write an error file so Grafana/you can see failures too
+            _last_written.pop(str(out_dir / f"{host}_ss_tin.json"), None)
             host_file = f"{host}_ss_tin_error.json"
             record = {
                 "meta": {"captured_at_utc": now, "mininet_host": host, "ok": False, "rc": rc},
                 "error": (err or "").strip(),
                 "stdout_head": (out or "")[:2000],
             }
-            atomic_write_text(out_dir / host_file, json.dumps(record, indent=2, ensure_ascii=False))
+            atomic_write_bytes(out_dir / host_file, dump_json(record))
             index["hosts"].append(
                 {"host": host, "file": host_file, "ok": False, "rc": rc, "n_sockets": 0}
             )
 
-    atomic_write_text(out_dir / "index.json", json.dumps(index, indent=2, ensure_ascii=False))
+    atomic_write_bytes(out_dir / "index.json", dump_json(index))
     return index
 
 
@@ -170,32 +225,58 @@ def start_collector_thread(
     Background thread that refreshes JSON snapshots periodically.
     If interval == 0, does one collection and returns.
     """
+    # Lives as long as the collector, so refreshes reuse the same threads
+    pool = ThreadPoolExecutor(max_workers=max(1, len(hosts)), thread_name_prefix="ss_tin_host")
+
     def loop() -> None:
         # Always do an initial collection
-        collect_and_write(hosts, m_path, out_dir, timeout)
+        collect_and_write(hosts, m_path, out_dir, timeout, pool)
 
         if interval <= 0:
+            pool.shutdown()
             return
 
         while True:
             time.sleep(interval)
             try:
-                collect_and_write(hosts, m_path, out_dir, timeout)
+                collect_and_write(hosts, m_path, out_dir, timeout, pool)
             except Exception as e:
                 # Keep the server alive even if one collection fails
                 err_obj = {
                     "meta": {"captured_at_utc": datetime.now(timezone.utc).isoformat()},
                     "error": f"collector exception: {type(e).__name__}: {e}",
                 }
-                atomic_write_text(out_dir / "collector_error.json", json.dumps(err_obj, indent=2))
+                atomic_write_bytes(out_dir / "collector_error.json", dump_json(err_obj))
 
     t = threading.Thread(target=loop, name="ss_tin_collector", daemon=True)
     t.start()
     return t
 
 
+class SnapshotRequestHandler(SimpleHTTPRequestHandler):
+    """
+    SimpleHTTPRequestHandler that hands file bodies to the kernel with
+    sendfile instead of copying them through Python in 64 KiB reads, and
+    lets clients cache the per-host snapshots for a second (index.json is
+    never cached, so pollers always see the latest file list).
+    """
+
+    def end_headers(self) -> None:
+        name = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+        if name == "index.json":
+            self.send_header("Cache-Control", "no-store")
+        elif name.endswith(".json"):
+            self.send_header("Cache-Control", "max-age=1")
+        super().end_headers()
+
+    def copyfile(self, source, outputfile) -> None:
+        # socket.sendfile() uses os.sendfile where available and falls back
+        # to plain sends otherwise (or when the socket has a timeout)
+        self.connection.sendfile(source)
+
+
 def serve_directory(out_dir: Path, bind: str, port: int) -> None:
-    handler = partial(SimpleHTTPRequestHandler, directory=str(out_dir))
+    handler = partial(SnapshotRequestHandler, directory=str(out_dir))
     httpd = ThreadingHTTPServer((bind, port), handler)
     print(f"[HTTP] Serving {out_dir} at http://{bind}:{port}/")
     print(f"[HTTP] Try: http://{bind}:{port}/index.json")
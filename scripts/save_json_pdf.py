@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
 Zip all .json files in ./results and move the zip to ./archived_experiments.
+With --zstd, write a multi-threaded .tar.zst instead (needs `zstandard`).
 
 Run this on the h1 VM.
 """
@@ -8,10 +9,17 @@ Run this on the h1 VM.
 from __future__ import annotations
 
 import argparse
+import os
+import tarfile
 from datetime import datetime
 from pathlib import Path
 from zipfile import ZipFile, ZIP_DEFLATED
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 
 def find_base_dir(start: Path, max_up: int = 6) -> Path:
     """
@@ -47,21 +55,57 @@ def unique_path(path: Path) -> Path:
         k += 1
 
 
+def list_json_files(results_dir: Path) -> list[Path]:
+    """
+    Return the .json files directly inside `results_dir`, sorted by name.
+    One os.scandir() pass; names are filtered as plain strings.
+    """
+    with os.scandir(results_dir) as it:
+        names = sorted(e.name for e in it if e.name.endswith(".json") and e.is_file())
+    return [results_dir / name for name in names]
+
+
 def create_zip(results_dir: Path, label: str) -> Path:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     zip_path = unique_path(results_dir / f"{timestamp}_{label}.zip")
 
-    json_files = sorted(results_dir.glob("*.json"))
+    json_files = list_json_files(results_dir)
     if not json_files:
         raise FileNotFoundError(f"No .json files found in: {results_dir}")
 
-    with ZipFile(zip_path, "w", compression=ZIP_DEFLATED) as zf:
+    # Level 1 instead of zlib's default 6: several times faster on the
+    # iperf3/ss JSON, for a slightly larger archive
+    with ZipFile(zip_path, "w", compression=ZIP_DEFLATED, compresslevel=1) as zf:
         for f in json_files:
             zf.write(f, arcname=f.name)
 
     return zip_path
 
 
+def create_tar_zst(results_dir: Path, label: str, level: int = 3) -> Path:
+    """
+    Same contents as create_zip(), as one zstd-compressed tar stream;
+    compression runs on all cores.
+    """
+    if zstandard is None:
+        raise SystemExit("--zstd needs the zstandard package (pip install zstandard)")
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    tar_path = unique_path(results_dir / f"{timestamp}_{label}.tar.zst")
+
+    json_files = list_json_files(results_dir)
+    if not json_files:
+        raise FileNotFoundError(f"No .json files found in: {results_dir}")
+
+    cctx = zstandard.ZstdCompressor(level=level, threads=-1)
+    with open(tar_path, "wb") as fh, cctx.stream_writer(fh) as zw:
+        with tarfile.open(fileobj=zw, mode="w|") as tf:
+            for f in json_files:
+                tf.add(f, arcname=f.name)
+
+    return tar_path
+
+
 def move_to_archive(zip_path: Path, archive_dir: Path) -> Path:
     archive_dir.mkdir(parents=True, exist_ok=True)
     dest = unique_path(archive_dir / zip_path.name)
@@ -75,6 +119,11 @@ def main() -> int:
     parser.add_argument("--cc-name", default="bbr3", help="Congestion control label part")
     parser.add_argument("--buf-bdp", type=int, default=32, help="Buffer in BDP label part")
 
+    parser.add_argument(
+        "--zstd",
+        action="store_true",
+        help="Write a .tar.zst (multi-threaded zstd) instead of a .zip",
+    )
     parser.add_argument(
         "--base-dir",
         default=None,
@@ -93,10 +142,13 @@ def main() -> int:
 
     label = build_label(args.exp_name, args.num_flows, args.cc_name, args.buf_bdp)
 
-    zip_path = create_zip(results_dir, label)
-    archived_path = move_to_archive(zip_path, archive_dir)
+    if args.zstd:
+        archive_path = create_tar_zst(results_dir, label)
+    else:
+        archive_path = create_zip(results_dir, label)
+    archived_path = move_to_archive(archive_path, archive_dir)
 
-    print(f"Archived zip: {archived_path}")
+    print(f"Archived {'tar.zst' if args.zstd else 'zip'}: {archived_path}")
     return 0
 
 
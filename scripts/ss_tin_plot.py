@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
-import re
+import functools
+import sys
 import time
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
+from _ss_info_scan import extract_ipport_tokens, keep_port, scan_info
+from _ss_summary_table import format_table
+
 # -------------------- CONFIG --------------------
 NUM_HOSTS   = 16
 HOST_PREFIX = "hs"     # "hs" or "hr"
@@ -27,53 +34,21 @@ def exec_quiet(cmd_list):
     return p.stdout or ""
 
 
-def _to_text(x):
-    if isinstance(x, (tuple, list)):
-        return "\n".join(str(p) for p in x if p is not None)
-    return str(x)
-
-
 # -------------------- PARSING HELPERS --------------------
-def _find_int(text, key):
-    m = re.search(rf"\b{key}:(\d+)\b", text)
-    return int(m.group(1)) if m else None
-
-def _find_float(text, key):
-    m = re.search(rf"\b{key}:(\d+(?:\.\d+)?)\b", text)
-    return float(m.group(1)) if m else None
-
-def _find_rtt(text):
-    m = re.search(r"\brtt:(\d+(?:\.\d+)?)/(\d+(?:\.\d+)?)\b", text)
-    if not m:
-        return None, None
-    return float(m.group(1)), float(m.group(2))
-
-def _find_rate_bps(text, key):
-    m = re.search(rf"\b{key}\s+(\d+)([KMG]?)bps\b", text)
-    if not m:
-        return None
-    val = float(m.group(1))
-    unit = m.group(2).upper()
-    scale = {"": 1.0, "K": 1e3, "M": 1e6, "G": 1e9}[unit]
-    return val * scale
-
-def _find_bbr_bw_bps(text):
-    m = re.search(r"bbr:\(.*?\bbw:(\d+)([KMG]?)bps", text)
-    if not m:
-        return None
-    val = float(m.group(1))
-    unit = m.group(2).upper()
-    scale = {"": 1.0, "K": 1e3, "M": 1e6, "G": 1e9}[unit]
-    return val * scale
-
-def _extract_ipport_tokens(header_line):
-    parts = header_line.split()
-    return [p for p in parts if ":" in p and re.search(r":\d+$", p)]
-
-def _keep_port(src, dst, port):
-    if port is None:
-        return True
-    return (src and src.endswith(f":{port}")) or (dst and dst.endswith(f":{port}"))
+# Per-flow fields taken from the tcp info line, in flow-dict order
+_INFO_FIELDS = ("cc", "rtt_ms", "minrtt_ms", "cwnd", "mss", "rto", "bytes_acked",
+                "send_bps", "pacing_bps", "delivery_bps", "bbr_bw_bps")
+
+@functools.lru_cache(maxsize=4096)
+def _parse_info_line(info):
+    """
+    Values of _INFO_FIELDS for one tcp info line, as a tuple. Cached on the
+    raw line: idle or app-limited flows print the same line every refresh.
+    """
+    tokens = info.split(None, 1)
+    vals = scan_info(info)
+    vals["cc"] = tokens[0] if tokens else None
+    return tuple(vals.get(k) for k in _INFO_FIELDS)
 
 
 def parse_ss_tin_output(ss_text, port_filter=None):
@@ -93,34 +68,17 @@ def parse_ss_tin_output(ss_text, port_filter=None):
         header = lines[i]
         info = lines[i + 1] if i + 1 < len(lines) else ""
 
-        ipports = _extract_ipport_tokens(header)
+        ipports = extract_ipport_tokens(header)
         src = ipports[0] if len(ipports) >= 1 else None
         dst = ipports[1] if len(ipports) >= 2 else None
 
-        if not _keep_port(src, dst, port_filter):
+        if not keep_port(src, dst, port_filter):
             i += 2
             continue
 
-        tokens = info.split()
-        cc = tokens[0] if tokens else None
-
-        rtt_ms, _ = _find_rtt(info)
-
-        flows.append({
-            "src": src,
-            "dst": dst,
-            "cc": cc,
-            "rtt_ms": rtt_ms,
-            "minrtt_ms": _find_float(info, "minrtt"),
-            "cwnd": _find_int(info, "cwnd"),
-            "mss": _find_int(info, "mss"),
-            "rto": _find_int(info, "rto"),
-            "bytes_acked": _find_int(info, "bytes_acked"),
-            "send_bps": _find_rate_bps(info, "send"),
-            "pacing_bps": _find_rate_bps(info, "pacing_rate"),
-            "delivery_bps": _find_rate_bps(info, "delivery_rate"),
-            "bbr_bw_bps": _find_bbr_bw_bps(info),
-        })
+        flow = {"src": src, "dst": dst}
+        flow.update(zip(_INFO_FIELDS, _parse_info_line(info)))
+        flows.append(flow)
 
         i += 2
 
@@ -139,15 +97,6 @@ def sum_or_none(vals):
 def bps_to_mbps(x):
     return None if x is None else (x / 1e6)
 
-def fmt_float(x, w=9, p=2):
-    return f"{'-':>{w}}" if x is None else f"{x:>{w}.{p}f}"
-
-def fmt_int(x, w=6):
-    return f"{'-':>{w}}" if x is None else f"{int(x):>{w}}"
-
-def fmt_bps(x, w=12):
-    return f"{'-':>{w}}" if x is None else f"{x:>{w}.3e}"
-
 def dominant_cc(ccs):
     ccs = [c for c in ccs if c]
     if not ccs:
@@ -190,25 +139,9 @@ def clear_only_table():
         print("\033[2J\033[H", end="")
 
 def print_table(rows):
-    header = (
-        f"{'Host':<5} {'#F':>3} {'CC':<5} "
-        f"{'RTT':>7} {'minRTT':>7} {'cwnd':>6} {'MSS':>5} {'RTO':>5} "
-        f"{'Send(M)':>9} {'Send(bps)':>12} "
-        f"{'ACK(M)':>9} {'ACK(bps)':>12} "
-        f"{'Pace(M)':>9} {'Del(M)':>9} {'BBRbw(M)':>9}"
-    )
-    print(header)
-    print("-" * len(header))
-
-    for r in rows:
-        print(
-            f"{r['host']:<5} {r['flows']:>3} {r['cc']:<5} "
-            f"{fmt_float(r['avg_rtt'],7,2)} {fmt_float(r['min_rtt'],7,2)} "
-            f"{fmt_float(r['avg_cwnd'],6,1)} {fmt_int(r['mss'],5)} {fmt_float(r['rto'],5,0)} "
-            f"{fmt_float(r['send_mbps'],9,2)} {fmt_bps(r['send_bps'],12)} "
-            f"{fmt_float(r['ack_mbps'],9,2)} {fmt_bps(r['ack_bps'],12)} "
-            f"{fmt_float(r['pacing_mbps'],9,2)} {fmt_float(r['delivery_mbps'],9,2)} {fmt_float(r['bbr_bw_mbps'],9,2)}"
-        )
+    """Draw the table with a single write."""
+    sys.stdout.write(format_table(rows))
+    sys.stdout.flush()
 
 
 # -------------------- MININET NAMESPACE ACCESS --------------------
@@ -242,41 +175,47 @@ def ss_in_host_namespace(host):
 
 # -------------------- MAIN MONITOR LOOP --------------------
 def monitor_ss_table():
-    prev_acked = {}  # host -> last total bytes_acked
-    prev_time = {}   # host -> timestamp
-
-    try:
-        while True:
-            rows = []
-            now = time.time()
-
-            for i in range(1, NUM_HOSTS + 1):
-                host = f"{HOST_PREFIX}{i}"
-
-                text = _to_text(ss_in_host_namespace(host))
-                flows = parse_ss_tin_output(text, port_filter=IPERF_PORT)
-
-                total_bytes_acked = sum_or_none([f["bytes_acked"] for f in flows]) or 0
-                last_bytes = prev_acked.get(host, total_bytes_acked)
-                last_t = prev_time.get(host, now)
-
-                dt = max(1e-6, now - last_t)
-                delta_bytes = max(0, total_bytes_acked - last_bytes)
-                ack_rate_bps = (delta_bytes * 8.0) / dt
-
-                prev_acked[host] = total_bytes_acked
-                prev_time[host] = now
-
-                summary = summarize_host(flows, ack_rate_bps)
-                summary["host"] = host
-                rows.append(summary)
-
-            clear_only_table()
-            print_table(rows)
-            time.sleep(REFRESH_S)
-
-    except KeyboardInterrupt:
-        print("\nStopped.")
+    hosts = [f"{HOST_PREFIX}{i}" for i in range(1, NUM_HOSTS + 1)]
+
+    # Per-host ACK bookkeeping, indexed like hosts; -1 = no sample yet
+    prev_acked = np.full(len(hosts), -1, dtype=np.int64)      # last total bytes_acked
+    prev_time = np.zeros(len(hosts), dtype=np.float64)
+
+    # One thread per host, kept for the whole session: the mnexec calls of a
+    # refresh overlap, so it takes about as long as the slowest host
+    with ThreadPoolExecutor(max_workers=NUM_HOSTS) as ex:
+        try:
+            while True:
+                now = time.time()
+
+                texts = list(ex.map(ss_in_host_namespace, hosts))
+                per_host = [parse_ss_tin_output(text, port_filter=IPERF_PORT) for text in texts]
+
+                # ACK progress rate (bits/s) for all hosts at once; a host's
+                # first sample counts as no progress
+                total_acked = np.array(
+                    [sum_or_none([f["bytes_acked"] for f in flows]) or 0 for flows in per_host],
+                    dtype=np.int64,
+                )
+                last_acked = np.where(prev_acked < 0, total_acked, prev_acked)
+                dt = np.maximum(1e-6, now - prev_time)
+                ack_rates = np.maximum(0, total_acked - last_acked) * 8.0 / dt
+
+                prev_acked[:] = total_acked
+                prev_time[:] = now
+
+                rows = []
+                for host, flows, ack_rate_bps in zip(hosts, per_host, ack_rates.tolist()):
+                    summary = summarize_host(flows, ack_rate_bps)
+                    summary["host"] = host
+                    rows.append(summary)
+
+                clear_only_table()
+                print_table(rows)
+                time.sleep(REFRESH_S)
+
+        except KeyboardInterrupt:
+            print("\nStopped.")
 
 
 if __name__ == "__main__":
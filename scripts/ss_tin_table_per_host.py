@@ -18,6 +18,8 @@ Examples:
   python3 ss_tin_table_per_host.py --hosts hs1,hs3,hs7 --wide
   python3 ss_tin_table_per_host.py --range 1-8 --json-dir ss_json
   python3 ss_tin_table_per_host.py --details hs2:0
+  python3 ss_tin_table_per_host.py --range 1-32 --batch
+  python3 ss_tin_table_per_host.py --range 1-4 --interval 2
 """
 
 from __future__ import annotations
@@ -26,9 +28,13 @@ import argparse
 import json
 import os
 import re
-import shutil
+import shlex
+import signal
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -46,216 +52,86 @@ except Exception as e:
     )
     sys.exit(1)
 
+# Long-lived `m <host> bash -s` and the output digest, for --interval polling
+from _ss_host_shell import HostShell, output_digest
+from _ss_table_common import CAP_BY_HEADER, build_rows, dump_json, print_table
 
-# -------------------- Formatting helpers --------------------
 
-def fmt_value(v: Any) -> str:
-    if v is None:
-        return ""
-    if isinstance(v, dict):
-        if "value" in v and "unit" in v and len(v) == 2:
-            return f"{v['value']}{v['unit']}"
-        if "a" in v and "b" in v and len(v) == 2:
-            return f"{v['a']}/{v['b']}"
-        return json.dumps(v, separators=(",", ":"), ensure_ascii=False)
-    if isinstance(v, list):
-        return ",".join(fmt_value(x) for x in v)
-    return str(v)
+# -------------------- Formatting helpers --------------------
 
+# The shared column caps, with a wider CC column than ss_tin_table.py
+TABLE_CAPS = {**CAP_BY_HEADER, "CC": 8}
 
-def ellipsize(s: str, width: int) -> str:
-    if width <= 0:
-        return ""
-    if len(s) <= width:
-        return s
-    if width <= 1:
-        return s[:width]
-    return s[: width - 1] + "…"
 
+def print_details(parsed: Dict[str, Any], idx: int) -> None:
+    sockets: List[Dict[str, Any]] = parsed.get("sockets", []) or []
+    if idx < 0 or idx >= len(sockets):
+        raise SystemExit(f"details index out of range: {idx} (valid 0..{len(sockets)-1})")
+    print(dump_json(sockets[idx]).decode("utf-8"))
 
-def get_metric(sock: Dict[str, Any], key: str, default: Any = "") -> Any:
-    metrics = sock.get("metrics", {}) or {}
-    return metrics.get(key, default)
 
+# -------------------- Mininet host execution --------------------
 
-def get_group_metric(sock: Dict[str, Any], group: str, key: str, default: Any = "") -> Any:
-    metrics = sock.get("metrics", {}) or {}
-    groups = metrics.get("groups", {}) or {}
-    g = groups.get(group, {}) or {}
-    return g.get(key, default)
+# m_path -> index into m_attempts() of the invocation pattern that last worked
+# for it; tried first by every later call, and kept across runs in
+# CMD_CACHE_PATH so a fresh run skips the probing too
+CMD_CACHE_PATH = os.path.expanduser("~/.cache/ss_tin_table/m_cmd.json")
+_working_attempt: Dict[str, int] = {}
 
 
-def build_rows(parsed: Dict[str, Any], wide: bool) -> Tuple[List[str], List[List[str]]]:
-    sockets: List[Dict[str, Any]] = parsed.get("sockets", []) or []
+def m_attempts(m_path: str, host: str) -> List[List[str]]:
+    """Common invocation patterns for `/home/ubuntu/mininet/util/m hsX <command>`."""
+    return [
+        [m_path, host, "ss", "-tin"],
+        [m_path, host, "ss -tin"],
+        [m_path, host, "--", "ss", "-tin"],
+        [m_path, host, "-c", "ss -tin"],     # some wrappers use -c
+        [m_path, host, "bash", "-lc", "ss -tin"],
+    ]
 
-    if wide:
-        headers = [
-            "#", "State", "Local", "Peer", "CC",
-            "rtt", "cwnd", "send", "pacing_rate", "delivery_rate",
-            "bytes_sent", "bytes_recv", "minrtt", "bbr_bw", "bbr_mrtt", "Flags",
-        ]
-    else:
-        headers = [
-            "#", "State", "Local", "Peer", "CC",
-            "rtt", "cwnd", "send", "delivery_rate", "bbr_bw", "Flags",
-        ]
-
-    rows: List[List[str]] = []
-    for i, s in enumerate(sockets):
-        local_raw = (s.get("local", {}) or {}).get("raw", "") or ""
-        peer_raw = (s.get("peer", {}) or {}).get("raw", "") or ""
-
-        cc = fmt_value(get_metric(s, "cc", ""))
-
-        rtt = fmt_value(get_metric(s, "rtt", ""))
-        cwnd = fmt_value(get_metric(s, "cwnd", ""))
-
-        send = fmt_value(get_metric(s, "send", ""))
-        pacing_rate = fmt_value(get_metric(s, "pacing_rate", ""))
-        delivery_rate = fmt_value(get_metric(s, "delivery_rate", ""))
-
-        bytes_sent = fmt_value(get_metric(s, "bytes_sent", ""))
-        bytes_recv = fmt_value(get_metric(s, "bytes_received", ""))
-        minrtt = fmt_value(get_metric(s, "minrtt", ""))
-
-        bbr_bw = fmt_value(get_group_metric(s, "bbr", "bw", ""))
-        bbr_mrtt = fmt_value(get_group_metric(s, "bbr", "mrtt", ""))
-
-        metrics = s.get("metrics", {}) or {}
-        flags_list = [str(f) for f in (metrics.get("flags", []) or [])]
-        flags = ",".join(flags_list)
-
-        if wide:
-            row = [
-                str(i),
-                str(s.get("state", "")),
-                local_raw,
-                peer_raw,
-                cc,
-                rtt,
-                cwnd,
-                send,
-                pacing_rate,
-                delivery_rate,
-                bytes_sent,
-                bytes_recv,
-                minrtt,
-                bbr_bw,
-                bbr_mrtt,
-                flags,
-            ]
-        else:
-            row = [
-                str(i),
-                str(s.get("state", "")),
-                local_raw,
-                peer_raw,
-                cc,
-                rtt,
-                cwnd,
-                send,
-                delivery_rate,
-                bbr_bw,
-                flags,
-            ]
-
-        rows.append(row)
-
-    return headers, rows
-
-
-def print_table(headers: List[str], rows: List[List[str]]) -> None:
-    term_w = shutil.get_terminal_size((140, 20)).columns
-
-    cap_by_header = {
-        "#": 4,
-        "State": 7,
-        "Local": 34,
-        "Peer": 34,
-        "CC": 8,
-        "rtt": 14,
-        "cwnd": 8,
-        "send": 14,
-        "pacing_rate": 16,
-        "delivery_rate": 16,
-        "bytes_sent": 12,
-        "bytes_recv": 12,
-        "minrtt": 12,
-        "bbr_bw": 16,
-        "bbr_mrtt": 10,
-        "Flags": 18,
-    }
-
-    cols = len(headers)
-    widths: List[int] = []
-    for ci in range(cols):
-        header = headers[ci]
-        max_cell = max((len(r[ci]) for r in rows), default=0)
-        w = max(len(header), max_cell)
-        w = min(w, cap_by_header.get(header, w))
-        widths.append(w)
-
-    def total_width(ws: List[int]) -> int:
-        return sum(ws) + 3 * (len(ws) - 1)
-
-    shrink_order = []
-    for h in ["Local", "Peer", "Flags", "bytes_sent", "bytes_recv", "pacing_rate", "delivery_rate", "send", "rtt"]:
-        if h in headers:
-            shrink_order.append(headers.index(h))
-
-    min_width = {i: 6 for i in range(cols)}
-    if "Local" in headers:
-        min_width[headers.index("Local")] = 18
-    if "Peer" in headers:
-        min_width[headers.index("Peer")] = 18
-    if "Flags" in headers:
-        min_width[headers.index("Flags")] = 8
-
-    while total_width(widths) > term_w and shrink_order:
-        changed = False
-        for idx in shrink_order:
-            if total_width(widths) <= term_w:
-                break
-            if widths[idx] > min_width.get(idx, 6):
-                widths[idx] -= 1
-                changed = True
-        if not changed:
-            break
 
-    header_line = " | ".join(ellipsize(h, widths[i]).ljust(widths[i]) for i, h in enumerate(headers))
-    sep_line = "-+-".join("-" * widths[i] for i in range(cols))
-    print(header_line)
-    print(sep_line)
+def load_cmd_cache(path: str = CMD_CACHE_PATH) -> Dict[str, int]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    # Drop entries that are not an index into m_attempts() (stale or edited)
+    n = len(m_attempts("", ""))
+    return {k: v for k, v in cache.items() if type(v) is int and 0 <= v < n}
 
-    for r in rows:
-        line = " | ".join(ellipsize(r[i], widths[i]).ljust(widths[i]) for i in range(cols))
-        print(line)
 
+def save_cmd_cache(cache: Dict[str, int], path: str = CMD_CACHE_PATH) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(cache, fh, indent=1, sort_keys=True)
+    os.replace(tmp, path)
 
-def print_details(parsed: Dict[str, Any], idx: int) -> None:
-    sockets: List[Dict[str, Any]] = parsed.get("sockets", []) or []
-    if idx < 0 or idx >= len(sockets):
-        raise SystemExit(f"details index out of range: {idx} (valid 0..{len(sockets)-1})")
-    print(json.dumps(sockets[idx], indent=2, ensure_ascii=False))
 
+def looks_like_ss(out: str) -> bool:
+    # Heuristic: consider "good" if it looks like ss output
+    return ("State" in out and "Recv-Q" in out and "Send-Q" in out) or ("ESTAB" in out)
 
-# -------------------- Mininet host execution --------------------
 
 def run_ss_tin_on_host(m_path: str, host: str, timeout: int) -> Tuple[int, str, str, List[List[str]]]:
     """
-    Tries several common invocation patterns for `/home/ubuntu/mininet/util/m hsX <command>`.
+    Tries the patterns of m_attempts() until one yields ss output, starting
+    with the one that last worked for this m_path.
     Returns: (returncode, stdout, stderr, attempted_cmds)
     """
-    attempts: List[List[str]] = [
-        [m_path, host, "ss", "-tin"],
-        [m_path, host, "ss -tin"],
-        [m_path, host, "--", "ss", "-tin"],
-        [m_path, host, "-c", "ss -tin"],     # some wrappers use -c
-        [m_path, host, "bash", "-lc", "ss -tin"],
-    ]
+    attempts = m_attempts(m_path, host)
+    order = list(range(len(attempts)))
+    first = _working_attempt.get(m_path)
+    if first in order:
+        order.remove(first)
+        order.insert(0, first)
 
     last_rc, last_out, last_err = 1, "", ""
-    for cmd in attempts:
+    for k in order:
+        cmd = attempts[k]
         try:
             p = subprocess.run(
                 cmd,
@@ -267,9 +143,8 @@ def run_ss_tin_on_host(m_path: str, host: str, timeout: int) -> Tuple[int, str,
             out = p.stdout or ""
             err = p.stderr or ""
 
-            # Heuristic: consider "good" if it looks like ss output
-            looks_like_ss = ("State" in out and "Recv-Q" in out and "Send-Q" in out) or ("ESTAB" in out)
-            if p.returncode == 0 and looks_like_ss:
+            if p.returncode == 0 and looks_like_ss(out):
+                _working_attempt[m_path] = k
                 return p.returncode, out, err, attempts
 
             last_rc, last_out, last_err = p.returncode, out, err
@@ -279,12 +154,84 @@ def run_ss_tin_on_host(m_path: str, host: str, timeout: int) -> Tuple[int, str,
     return last_rc, last_out, last_err, attempts
 
 
+def run_ss_tin_batch(m_path: str, hosts: List[str], timeout: int) -> Dict[str, Tuple[int, str, str]]:
+    """
+    Runs `ss -tin` on every host from a single bash process: each host's `m`
+    call goes to the background with its output in a temp file, and bash
+    waits for all of them. Uses the invocation pattern that last worked for
+    m_path. Returns {host: (returncode, stdout, stderr)} for the hosts that
+    produced ss output; the caller retries the others one by one.
+    """
+    k = _working_attempt.get(m_path, 0)
+    if not 0 <= k < len(m_attempts(m_path, "")):
+        k = 0
+    script = [
+        f"{{ {shlex.join(m_attempts(m_path, h)[k])} >{j}.out 2>{j}.err; echo $? >{j}.rc; }} &"
+        for j, h in enumerate(hosts)
+    ]
+    script.append("wait")
+
+    results: Dict[str, Tuple[int, str, str]] = {}
+    with tempfile.TemporaryDirectory(prefix="ss_tin_") as tmp:
+        # Own process group, so a timeout takes the backgrounded m calls down too
+        p = subprocess.Popen(["bash", "-c", "\n".join(script)], cwd=tmp,
+                             stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             start_new_session=True)
+        try:
+            p.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(p.pid, signal.SIGKILL)
+            p.wait()
+
+        base = Path(tmp)
+        for j, h in enumerate(hosts):
+            try:
+                rc = int((base / f"{j}.rc").read_text())
+            except (OSError, ValueError):
+                continue  # still running at the timeout
+            out = (base / f"{j}.out").read_text(errors="replace")
+            if rc == 0 and looks_like_ss(out):
+                results[h] = (rc, out, (base / f"{j}.err").read_text(errors="replace"))
+
+    return results
+
+
+def run_ss_tin_via_shell(
+    shells: Dict[str, Optional[HostShell]], m_path: str, host: str, timeout: int
+) -> Tuple[int, str, str, List[List[str]]]:
+    """
+    run_ss_tin_on_host() through the host's persistent shell in `shells`,
+    started on first use. A shell that dies is replaced on the next poll;
+    if a host's first shell already fails (m without `bash -s` support),
+    the host is marked None and stays on run_ss_tin_on_host().
+    """
+    first = host not in shells
+    shell = shells.get(host)
+    if first or shell is not None:
+        try:
+            if shell is None or not shell.alive():
+                shell = shells[host] = HostShell(m_path, host)
+            rc, out = shell.run_ss(timeout)
+            if rc == 0 and looks_like_ss(out):
+                return rc, out, "", m_attempts(m_path, host)
+        except (OSError, ValueError):
+            # Dead, hung or garbled shell: closed here, not alive() next time
+            if shell is not None:
+                shell.close()
+            if first:
+                shells[host] = None
+    return run_ss_tin_on_host(m_path, host, timeout)
+
+
+_RANGE_RE = re.compile(r"^\s*(\d+)\s*-\s*(\d+)\s*$")
+
+
 def parse_host_list(args_hosts: Optional[str], args_range: Optional[str], prefix: str) -> List[str]:
     if args_hosts:
         return [h.strip() for h in args_hosts.split(",") if h.strip()]
 
     if args_range:
-        m = re.match(r"^\s*(\d+)\s*-\s*(\d+)\s*$", args_range)
+        m = _RANGE_RE.match(args_range)
         if not m:
             raise SystemExit("--range must be like 1-8")
         a = int(m.group(1))
@@ -308,6 +255,11 @@ def main() -> int:
     ap.add_argument("--details", default=None, help="Print full JSON for one socket: format host:index, e.g. hs2:0")
     ap.add_argument("--timeout", type=int, default=10, help="Timeout seconds per host command.")
     ap.add_argument("--json-dir", default=None, help="If set, writes parsed JSON per host into this directory.")
+    ap.add_argument("--batch", action="store_true",
+                    help="Start every host's ss -tin from one bash process (hosts that fail are retried one by one).")
+    ap.add_argument("--interval", type=float, default=None, metavar="S",
+                    help="Poll again every S seconds until Ctrl+C, through one long-lived shell per host "
+                         "(--batch is not used then).")
     args = ap.parse_args()
 
     m_path = args.m_path
@@ -331,41 +283,88 @@ def main() -> int:
             raise SystemExit("--details index must be an integer")
         details_idx = int(idx_s)
 
+    _working_attempt.update(load_cmd_cache())
+    cached_attempts = dict(_working_attempt)
+
+    # Host -> its persistent shell (--interval only); None = m cannot keep one
+    shells: Dict[str, Optional[HostShell]] = {}
+    batched: Dict[str, Tuple[int, str, str]] = {}
+    # Host -> (output_digest(out), parsed) from its last successful poll
+    last_seen: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+    def collect(host: str) -> Tuple[int, str, str, List[List[str]]]:
+        if host in batched:
+            return batched[host] + (m_attempts(m_path, host),)
+        if args.interval is not None:
+            return run_ss_tin_via_shell(shells, m_path, host, args.timeout)
+        return run_ss_tin_on_host(m_path, host, args.timeout)
+
     any_ok = False
 
-    for host in hosts:
-        rc, out, err, attempted = run_ss_tin_on_host(m_path, host, args.timeout)
-
-        print()
-        print("=" * 80)
-        print(f"{host} | ss -tin | {datetime.now().isoformat(timespec='seconds')}")
-        print("=" * 80)
-
-        if rc != 0 or not out.strip():
-            print(f"ERROR: failed to run ss -tin on {host} (rc={rc})", file=sys.stderr)
-            if err.strip():
-                print(err.strip(), file=sys.stderr)
-            print("Tried commands:", file=sys.stderr)
-            for cmd in attempted:
-                print("  " + " ".join(cmd), file=sys.stderr)
-            continue
-
-        parsed = parse_ss_tin_output(out)
-        any_ok = True
-
-        if json_dir is not None:
-            (json_dir / f"{host}_ss_tin.json").write_text(json.dumps(parsed, indent=2, ensure_ascii=False), encoding="utf-8")
-
-        if details_host == host and details_idx is not None:
-            print_details(parsed, details_idx)
-            # If details is requested, still continue to other hosts (useful)
-            continue
-
-        headers, rows = build_rows(parsed, wide=args.wide)
-        if not rows:
-            print("(no sockets parsed)")
-        else:
-            print_table(headers, rows)
+    # Every host's `m ... ss -tin` runs at once (the calls only wait on
+    # subprocesses); results come back in host order, so each table prints
+    # as soon as its host and all the ones before it are done
+    pool = ThreadPoolExecutor(max_workers=min(32, len(hosts) or 1))
+    try:
+        while True:
+            if args.batch and args.interval is None:
+                batched = run_ss_tin_batch(m_path, hosts, args.timeout)
+
+            for host, (rc, out, err, attempted) in zip(hosts, pool.map(collect, hosts)):
+                bar = "=" * 80
+                sys.stdout.write(f"\n{bar}\n{host} | ss -tin | {datetime.now().isoformat(timespec='seconds')}\n{bar}\n")
+
+                if rc != 0 or not out.strip():
+                    print(f"ERROR: failed to run ss -tin on {host} (rc={rc})", file=sys.stderr)
+                    if err.strip():
+                        print(err.strip(), file=sys.stderr)
+                    print("Tried commands:", file=sys.stderr)
+                    for cmd in attempted:
+                        print("  " + " ".join(cmd), file=sys.stderr)
+                    continue
+
+                any_ok = True
+
+                # Same raw output as this host's last poll (idle sockets under
+                # --interval): reuse that parse, and the JSON file already on disk
+                digest = output_digest(out)
+                prev = last_seen.get(host)
+                if prev is not None and prev[0] == digest:
+                    parsed = prev[1]
+                else:
+                    parsed = parse_ss_tin_output(out)
+                    last_seen[host] = (digest, parsed)
+                    if json_dir is not None:
+                        (json_dir / f"{host}_ss_tin.json").write_bytes(dump_json(parsed))
+
+                if details_host == host and details_idx is not None:
+                    print_details(parsed, details_idx)
+                    # If details is requested, still continue to other hosts (useful)
+                    continue
+
+                headers, rows = build_rows(parsed, wide=args.wide)
+                if not rows:
+                    print("(no sockets parsed)")
+                else:
+                    print_table(headers, rows, TABLE_CAPS)
+
+            if args.interval is None:
+                break
+            sys.stdout.flush()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
+        for shell in shells.values():
+            if shell is not None:
+                shell.close()
+
+    if _working_attempt != cached_attempts:
+        try:
+            save_cmd_cache(_working_attempt)
+        except OSError as e:
+            print(f"Warning: could not write {CMD_CACHE_PATH}: {e}", file=sys.stderr)
 
     return 0 if any_ok else 2
 
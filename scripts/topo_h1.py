@@ -1,13 +1,28 @@
 #!/usr/bin/python
 
 import os
+import signal
 import subprocess
 import sys
 from mininet.net import Mininet
 from mininet.node import OVSKernelSwitch
 from mininet.cli import CLI
 
-def start_mininet_hosts(num_hosts, buffer_size):
+HOST_DAEMON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "host_daemon.py")
+HOST_DAEMON_DIR = "/var/run/aqm_cca"
+
+def start_host_daemons(hosts):
+    # One scripts/host_daemon.py per host, listening on HOST_DAEMON_DIR/<host>.sock
+    # (used by run_test.py --host-daemon instead of an m launch per command)
+    os.makedirs(HOST_DAEMON_DIR, exist_ok=True)
+    pids = []
+    for h in hosts:
+        h.cmd(f'{sys.executable} {HOST_DAEMON} {HOST_DAEMON_DIR}/{h.name}.sock > /dev/null 2>&1 &')
+        pids.append(int(h.cmd('echo $!')))
+    print(f"Host daemons listening in {HOST_DAEMON_DIR}")
+    return pids
+
+def start_mininet_hosts(num_hosts, buffer_size, host_daemons=False):
     RED = "\033[31m"
     RESET = "\033[0m"
     net = Mininet(topo=None, build=False, ipBase='172.16.0.0/16')
@@ -35,12 +50,14 @@ def start_mininet_hosts(num_hosts, buffer_size):
  
     # Creating hosts on the left
     print("Creating left hosts")
+    hosts = []
     for i in range(num_hosts):
         third_octet = (i // 254) % 256
         fourth_octet = (i % 254) + 1
 
         ip_address = f'172.16.{third_octet}.{fourth_octet}/16'
         hs = net.addHost(f'hs{i+1}', ip=ip_address)
+        hosts.append(hs)
 
         net.addLink(hs, s_left[int(i/host_sw)])
         hs.cmd('sysctl -w net.ipv4.tcp_wmem="{} {} {}"'.format(buffer_size, buffer_size, buffer_size))
@@ -52,11 +69,18 @@ def start_mininet_hosts(num_hosts, buffer_size):
     # Start the network
     net.start()
     print("Starting the network")
+
+    daemon_pids = start_host_daemons(hosts) if host_daemons else []
     
     # Open the Mininet CLI
     net.interact()
     
     # Clean up after the network has been stopped
+    for pid in daemon_pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
     net.stop()
     
 
@@ -70,8 +94,11 @@ def main():
         print("No arguments passed. Specify the number of hosts e.g., sudo python3 topo_h1.py 1024")
         exit()
 
+    # Optional: sudo python3 topo_h1.py 128 --host-daemon
+    host_daemons = "--host-daemon" in sys.argv[2:]
+
     TCP_buffer_size = "4096 1000000 200000000"
-    start_mininet_hosts(num_hosts, TCP_buffer_size)
+    start_mininet_hosts(num_hosts, TCP_buffer_size, host_daemons)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file